@@ -0,0 +1,211 @@
+# =====================================
+# almacen_imagenes.py
+# =====================================
+"""
+Almacén de fotos de producto direccionado por contenido, compartido por el
+extractor (leer_catalogo_viejo) y el generador (main.py).
+
+    almacen_imagenes/
+        blobs/ab/abcdef....jpg   una sola copia de cada foto distinta
+        indice.json              {"codigos": {código: blob}, "perceptual": {huella: blob}}
+
+Cada foto se guarda con el sha256 de sus bytes como nombre. Además se
+calcula una huella perceptual (dHash de 64 bits + tamaño + color medio): dos
+recortes con la misma huella cuyos píxeles solo difieren por la
+recompresión JPEG (misma_foto) comparten blob. Como el generador dibuja por ruta, ReportLab incrusta
+cada blob una sola vez aunque lo usen muchos códigos.
+
+Importar una carpeta existente (p. ej. la antigua images/ del extractor):
+    python almacen_imagenes.py importar images
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+from PIL import Image, ImageChops
+
+from archivos import escritura_atomica
+from instrumentacion import contar
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+ALMACEN_DIR = "almacen_imagenes"
+DEDUP_PERCEPTUAL = True    # unir fotos casi idénticas (misma huella perceptual)
+# Dos fotos con la misma huella se unen solo si a lo sumo esta fracción de
+# píxeles difiere en más de UMBRAL_PIXEL niveles de gris: la recompresión
+# JPEG queda muy por debajo, un código o texto distinto en la foto no.
+UMBRAL_PIXEL = 64
+TOLERANCIA_PIXELES = 0.0005
+EXTENSIONES = (".jpg", ".jpeg", ".png")
+INDICE_VERSION = 1
+SIN_CODIGO = re.compile(r"^page_\d+_img_\d+$")  # recortes del extractor sin código asociado
+
+
+# -------------------------------
+# HUELLAS
+# -------------------------------
+def huella_bytes(datos):
+    return hashlib.sha256(datos).hexdigest()
+
+
+def huella_perceptual(img):
+    """
+    dHash de 64 bits de una imagen PIL, más su tamaño y su color medio
+    (el dHash solo mira la luminancia y confundiría la misma bolsa en otro color).
+    """
+    gris = img.convert("L").resize((9, 8), Image.LANCZOS)
+    px = gris.tobytes()
+    bits = 0
+    for fila in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[fila * 9 + col] > px[fila * 9 + col + 1])
+    medio = img.convert("RGB").resize((1, 1), Image.BOX).getpixel((0, 0))
+    color = "".join(f"{v // 16:x}" for v in medio)
+    return f"{bits:016x}-{img.width}x{img.height}-{color}"
+
+
+def misma_foto(a, b):
+    """True si las imágenes PIL `a` y `b` son la misma foto salvo recompresión."""
+    if a.size != b.size:
+        return False
+    dif = ImageChops.difference(a.convert("L"), b.convert("L")).histogram()
+    return sum(dif[UMBRAL_PIXEL:]) <= TOLERANCIA_PIXELES * a.width * a.height
+
+
+# -------------------------------
+# ALMACÉN
+# -------------------------------
+class AlmacenImagenes:
+    """
+    Fotos de producto indexadas por código. agregar() es seguro entre
+    hilos; guardar_indice() persiste el índice (se llama al terminar).
+    """
+
+    def __init__(self, directorio=ALMACEN_DIR, dedup_perceptual=DEDUP_PERCEPTUAL):
+        self.directorio = directorio
+        self.dedup_perceptual = dedup_perceptual
+        self._lock = threading.Lock()
+        self._codigos = {}
+        self._perceptual = {}
+        self.escritos = 0
+        self.reutilizados = 0
+        self._cargar_indice()
+
+    # --- índice ---
+    @property
+    def ruta_indice(self):
+        return os.path.join(self.directorio, "indice.json")
+
+    def _cargar_indice(self):
+        try:
+            with open(self.ruta_indice, encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return
+        if datos.get("version") == INDICE_VERSION:
+            self._codigos = datos.get("codigos", {})
+            self._perceptual = datos.get("perceptual", {})
+
+    def guardar_indice(self):
+        with self._lock:
+            datos = {"version": INDICE_VERSION, "codigos": dict(sorted(self._codigos.items())),
+                     "perceptual": self._perceptual}
+        os.makedirs(self.directorio, exist_ok=True)
+        with escritura_atomica(self.ruta_indice) as temporal:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(datos, f, ensure_ascii=False, separators=(",", ":"))
+
+    # --- blobs ---
+    def ruta_blob(self, blob):
+        return os.path.join(self.directorio, "blobs", blob[:2], blob)
+
+    def agregar(self, codigo, datos, extension, perceptual=None):
+        """
+        Guarda los bytes `datos` (imagen ya codificada, `extension` .jpg o
+        .png) como la foto de `codigo` y devuelve la ruta del blob. Si ya hay
+        un blob con los mismos bytes, o con la misma huella `perceptual`
+        (cadena de huella_perceptual) y que misma_foto() confirma, se
+        reutiliza en lugar de escribir otro.
+        """
+        blob = huella_bytes(datos) + extension.lower()
+        ruta = self.ruta_blob(blob)
+        with self._lock:
+            existente = self._perceptual.get(perceptual) if perceptual and self.dedup_perceptual else None
+        if existente and existente != blob and self._coincide(datos, existente):
+            with self._lock:
+                self._codigos[codigo] = existente
+                self.reutilizados += 1
+            return self.ruta_blob(existente)
+        with self._lock:
+            if perceptual:
+                self._perceptual.setdefault(perceptual, blob)
+            self._codigos[codigo] = blob
+            nuevo = not os.path.exists(ruta)
+            if nuevo:
+                self.escritos += 1
+            else:
+                self.reutilizados += 1
+        if nuevo:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with escritura_atomica(ruta) as temporal:
+                with open(temporal, "wb") as f:
+                    f.write(datos)
+            contar("bytes_escritos", len(datos))
+        return ruta
+
+    def _coincide(self, datos, blob):
+        try:
+            with Image.open(io.BytesIO(datos)) as a, Image.open(self.ruta_blob(blob)) as b:
+                return misma_foto(a, b)
+        except OSError:
+            return False
+
+    def agregar_archivo(self, codigo, ruta):
+        """Agrega al almacén la imagen del archivo `ruta` como foto de `codigo`."""
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        with Image.open(ruta) as img:
+            perceptual = huella_perceptual(img)
+        return self.agregar(codigo, datos, os.path.splitext(ruta)[1], perceptual)
+
+    def ruta(self, codigo):
+        """Ruta del blob de `codigo`, o None si el código no tiene foto."""
+        blob = self._codigos.get(codigo)
+        return self.ruta_blob(blob) if blob else None
+
+    def __contains__(self, codigo):
+        return codigo in self._codigos
+
+    def __len__(self):
+        return len(self._codigos)
+
+    def blobs(self):
+        """Cantidad de fotos distintas referenciadas por el índice."""
+        return len(set(self._codigos.values()))
+
+
+def importar_carpeta(carpeta, almacen=None):
+    """
+    Agrega cada <código>.jpg/.png de `carpeta` al almacén (salvo los
+    recortes sin código) y devuelve el almacén.
+    """
+    if almacen is None:
+        almacen = AlmacenImagenes()
+    for nombre in sorted(os.listdir(carpeta)):
+        codigo, ext = os.path.splitext(nombre)
+        if ext.lower() in EXTENSIONES and not SIN_CODIGO.match(codigo):
+            almacen.agregar_archivo(codigo, os.path.join(carpeta, nombre))
+    almacen.guardar_indice()
+    return almacen
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "importar":
+        a = importar_carpeta(sys.argv[2])
+        print(f"✅ {len(a)} códigos, {a.blobs()} fotos distintas en {a.directorio}/")
+    else:
+        print(__doc__)
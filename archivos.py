@@ -0,0 +1,34 @@
+# =====================================
+# archivos.py
+# =====================================
+"""
+Escritura atómica de archivos compartidos entre hilos y procesos (miniaturas,
+blobs del almacén, recortes, índices, manifiestos, páginas y PDFs unidos).
+
+    with escritura_atomica(destino) as temporal:
+        with open(temporal, "wb") as f:
+            f.write(datos)
+
+Se escribe en un temporal propio del proceso y del hilo junto a `destino` y
+al terminar se renombra con os.replace, así que nadie lee un archivo a medio
+escribir y dos escritores del mismo destino no se pisan el temporal. Si el
+bloque falla, el temporal se borra y `destino` queda como estaba.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+
+@contextmanager
+def escritura_atomica(destino):
+    """Devuelve la ruta temporal donde escribir; al salir la mueve a `destino`."""
+    temporal = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield temporal
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    os.replace(temporal, destino)
@@ -0,0 +1,361 @@
+# =====================================
+# benchmark.py
+# =====================================
+"""
+Medición de rendimiento de la generación de catálogos y del extractor.
+
+Genera hojas e imágenes sintéticas, mide generar_catalogo de punta a punta
+y por etapas (carga, división de textos, imágenes, encabezados/footers,
+guardado), la memoria máxima (RSS) y el tamaño del PDF. Con cada perfil de
+salida (perfiles_salida.py) mide el tiempo y el tamaño del PDF, repartido
+en imágenes, fuentes y vectores. También mide las etapas de
+leer_catalogo_viejo sobre el PDF generado.
+
+Uso:
+    python benchmark.py                          # 100, 1k, 10k y 50k filas
+    python benchmark.py --filas 100 1000 --salida bench.json
+    python benchmark.py --baseline bench_base.json --umbral 0.25
+
+Con --baseline el proceso termina con código 1 si algún tiempo empeora más
+que el umbral (fracción) respecto a la línea base.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FILAS_POR_DEFECTO = [100, 1000, 10000, 50000]
+IMAGENES_DISTINTAS = 200      # fotos sintéticas reutilizadas entre filas
+TAMAÑO_IMAGEN = (900, 700)    # px, parecido a las fotos de images/
+PAGINAS_EXTRACTOR = 6         # páginas del PDF generado que recorre el extractor
+ARCHIVOS_APOYO = ["logo2.png", "instagram.png"]
+PALABRAS = ("BOLSA PACK ZIPLOC VASO PLATO PLÁSTICO DESECHABLE CARTÓN TAPA ROLLO "
+            "FILM ESTIRABLE MANUAL 18X20CM 27X28CM 1X15UND 200U 8.5\" 20PZS "
+            "TRANSPARENTE BLANCO NEGRO GRANDE MEDIANO").split()
+
+
+# -------------------------------
+# DATOS SINTÉTICOS
+# -------------------------------
+def crear_datos(carpeta, filas, semilla=1234):
+    """Crea productos.xlsx e imagenes/ en `carpeta` con `filas` productos."""
+    from openpyxl import Workbook
+    from PIL import Image, ImageDraw
+
+    rnd = random.Random(semilla)
+    os.makedirs(os.path.join(carpeta, "imagenes"), exist_ok=True)
+    for i in range(min(IMAGENES_DISTINTAS, filas)):
+        img = Image.new("RGB", TAMAÑO_IMAGEN, (255, 255, 255))
+        d = ImageDraw.Draw(img)
+        for _ in range(12):
+            x0, y0 = rnd.randrange(0, 700), rnd.randrange(0, 500)
+            d.rectangle([x0, y0, x0 + rnd.randrange(50, 200), y0 + rnd.randrange(50, 200)],
+                        fill=tuple(rnd.randrange(256) for _ in range(3)))
+        img.save(os.path.join(carpeta, "imagenes", f"SYN-{i:06d}.jpg"), quality=90)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["codigo", "descripcion", "imagen"])
+    for i in range(filas):
+        descripcion = " ".join(rnd.choice(PALABRAS) for _ in range(rnd.randint(3, 12)))
+        ws.append([f"SYN-{i:06d}", descripcion, f"SYN-{i % IMAGENES_DISTINTAS:06d}.jpg"])
+    wb.save(os.path.join(carpeta, "productos.xlsx"))
+
+    for nombre in ARCHIVOS_APOYO:
+        origen = os.path.join(BASE_DIR, nombre)
+        if os.path.exists(origen):
+            shutil.copy(origen, carpeta)
+
+
+def _rss_max_mb():
+    try:
+        import resource
+    except ImportError:
+        # Windows no tiene resource: el pico del working set sale de psutil, si está
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# -------------------------------
+# CASOS (se ejecutan en un proceso aparte para medir su RSS)
+# -------------------------------
+def medir_generador():
+    """Mide la generación con la hoja productos.xlsx del directorio actual."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    import main
+    import texto
+    from fuentes import cargar_fuentes
+    from encabezados import draw_header_pageN, get_logo_path
+    from footer import draw_footer
+    from cache_imagenes import CacheImagenes
+    from plantillas import Plantillas
+    from maquetacion import planificar
+
+    color = colors.HexColor("#63B7FF")
+    etapas = {}
+    cargar_fuentes()
+
+    t = time.perf_counter()
+    productos = main.leer_productos()
+    etapas["carga"] = time.perf_counter() - t
+
+    texto.dividir.cache_clear()
+    t = time.perf_counter()
+    envolturas = main.dividir_descripciones(productos)
+    etapas["texto"] = time.perf_counter() - t
+    paginas = planificar(len(productos), main.MAQUETA)
+
+    # Imágenes: resolución en caché (miniaturas nuevas) + drawImage
+    shutil.rmtree(".cache_imagenes", ignore_errors=True)
+    imagenes = CacheImagenes()
+    c = canvas.Canvas(os.devnull, pagesize=A4)
+    t = time.perf_counter()
+    for p in productos:
+        try:
+            c.drawImage(imagenes.obtener(p.imagen), 0, 0, width=100, height=50,
+                        preserveAspectRatio=True, mask='auto')
+        except OSError:
+            pass
+    etapas["imagenes"] = time.perf_counter() - t
+
+    # Encabezados y footers de todas las páginas, sin y con plantillas
+    logo_path = get_logo_path()
+    c = canvas.Canvas(os.devnull, pagesize=A4)
+    t = time.perf_counter()
+    for _ in paginas:
+        draw_header_pageN(c, "BENCH", color, logo_path)
+        draw_footer(c, color)
+        c.showPage()
+    etapas["encabezados"] = time.perf_counter() - t
+    c = canvas.Canvas(os.devnull, pagesize=A4)
+    plantillas = Plantillas(c)
+    t = time.perf_counter()
+    for _ in paginas:
+        plantillas.header_pageN("BENCH", color, logo_path)
+        plantillas.footer(color)
+        c.showPage()
+    etapas["encabezados_plantillas"] = time.perf_counter() - t
+
+    # Dibujo completo y guardado por separado (caché de imágenes ya caliente)
+    c = canvas.Canvas("bench.pdf", pagesize=A4)
+    t = time.perf_counter()
+    main.renderizar_paginas(c, productos, paginas, "BENCH", color, logo_path,
+                            imagenes, Plantillas(c), envolturas)
+    etapas["dibujo"] = time.perf_counter() - t
+    t = time.perf_counter()
+    c.save()
+    etapas["guardado"] = time.perf_counter() - t
+
+    # De punta a punta, con la caché de miniaturas en disco vacía
+    shutil.rmtree(".cache_imagenes", ignore_errors=True)
+    t = time.perf_counter()
+    main.generar_catalogo("BENCH", color, imagenes=CacheImagenes(), output_file="catalogo.pdf", workers=1)
+    total = time.perf_counter() - t
+
+    return {
+        "filas": len(productos),
+        "paginas": len(paginas),
+        "total_s": total,
+        "etapas_s": etapas,
+        "pdf_bytes": os.path.getsize("catalogo.pdf"),
+        "perfiles": medir_perfiles(color),
+        "rss_max_mb": _rss_max_mb(),
+    }
+
+
+def medir_perfiles(color):
+    """Tiempo de punta a punta y bytes del PDF con cada perfil de salida (caché en disco vacía)."""
+    import main
+    from perfiles_salida import PERFILES, limpiar_caches, reporte_bytes
+
+    resultados = {}
+    for nombre in PERFILES:
+        shutil.rmtree(".cache_imagenes", ignore_errors=True)
+        limpiar_caches()
+        salida = f"catalogo_{nombre}.pdf"
+        t = time.perf_counter()
+        main.generar_catalogo("BENCH", color, output_file=salida, perfil=nombre, workers=1)
+        resultados[nombre] = {"total_s": time.perf_counter() - t, "bytes": reporte_bytes(salida)}
+    return resultados
+
+
+def cargar_extractor():
+    """Importa leer_catalogo_viejo (es un script sin extensión .py)."""
+    from importlib.machinery import SourceFileLoader
+    from importlib.util import module_from_spec, spec_from_loader
+    loader = SourceFileLoader("leer_catalogo_viejo", os.path.join(BASE_DIR, "leer_catalogo_viejo"))
+    modulo = module_from_spec(spec_from_loader(loader.name, loader))
+    loader.exec_module(modulo)
+    return modulo
+
+
+def medir_extractor(pdf_path, max_paginas=PAGINAS_EXTRACTOR):
+    """Mide las etapas de leer_catalogo_viejo sobre las primeras páginas de pdf_path."""
+    try:
+        import cv2
+        import numpy as np
+        import pdfplumber
+    except ImportError as e:
+        return {"omitido": f"falta dependencia del extractor: {e.name}"}
+
+    ext = cargar_extractor()
+    etapas = {k: 0.0 for k in ("rasterizar", "detectar", "partir", "codigos", "asociar", "guardar")}
+    n = 0
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[:max_paginas]:
+            t = time.perf_counter()
+            im = page.to_image(resolution=ext.DPI)
+            page_bgr = cv2.cvtColor(np.array(im.original), cv2.COLOR_RGB2BGR)
+            etapas["rasterizar"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            regiones, bordes = ext.detectar_regiones(page_bgr, ext.DETECCION_ESCALA)
+            etapas["detectar"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            regiones = [s for r in regiones
+                        for s in ext.split_region_by_horizontal_seam(page_bgr, r, bordes=bordes,
+                                                                     escala=ext.DETECCION_ESCALA)]
+            etapas["partir"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            codes = ext.detectar_codigos_pdf(page)
+            etapas["codigos"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            mapping = ext.asociar_regiones_a_codigos(regiones, codes, im.scale) if codes else {}
+            etapas["asociar"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            for i, rect in enumerate(regiones):
+                ext.guardar_recorte(page_bgr, rect, os.path.join(ext.OUTPUT_DIR, f"r_{n}_{i}.jpg"))
+            ext.dibujar_debug(page_bgr, regiones, mapping, codes, n)
+            etapas["guardar"] += time.perf_counter() - t
+            n += 1
+
+    return {"paginas": n, "total_s": sum(etapas.values()), "etapas_s": etapas}
+
+
+def ejecutar_caso(filas):
+    """Corre un caso completo en un directorio temporal (llamado en el subproceso)."""
+    sys.path.insert(0, BASE_DIR)
+    with tempfile.TemporaryDirectory(prefix=f"bench_{filas}_") as tmp:
+        crear_datos(tmp, filas)
+        os.chdir(tmp)
+        resultado = {"generador": medir_generador()}
+        resultado["extractor"] = medir_extractor("catalogo.pdf")
+        os.chdir(BASE_DIR)
+    return resultado
+
+
+# -------------------------------
+# COMPARACIÓN CON LA LÍNEA BASE
+# -------------------------------
+def _tiempos(resultados):
+    """Aplana los tiempos a {"1000/generador/etapas_s/texto": segundos, ...}."""
+    planos = {}
+
+    def recorrer(prefijo, valor):
+        if isinstance(valor, dict):
+            for k, v in valor.items():
+                recorrer(f"{prefijo}/{k}", v)
+        elif isinstance(valor, (int, float)) and any(p.endswith("_s") for p in prefijo.split("/")):
+            planos[prefijo.lstrip("/")] = valor
+
+    recorrer("", resultados["casos"])
+    return planos
+
+
+def comparar(resultados, baseline, umbral, minimo_s=0.05):
+    """Devuelve la lista de regresiones (métrica, base, actual) mayores al umbral."""
+    actuales, base = _tiempos(resultados), _tiempos(baseline)
+    regresiones = []
+    for clave, valor in sorted(actuales.items()):
+        anterior = base.get(clave)
+        # Tiempos muy cortos son ruido: se ignoran por debajo de minimo_s
+        if anterior is None or max(anterior, valor) < minimo_s:
+            continue
+        if valor > anterior * (1 + umbral):
+            regresiones.append((clave, anterior, valor))
+    return regresiones
+
+
+def imprimir_resumen(resultados):
+    print(f"\n{'filas':>7}{'páginas':>9}{'total s':>10}{'PDF MB':>9}{'RSS MB':>9}   etapas")
+    for filas, caso in resultados["casos"].items():
+        g = caso["generador"]
+        etapas = " ".join(f"{k}={v:.2f}" for k, v in g["etapas_s"].items())
+        rss = f"{g['rss_max_mb']:>9.0f}" if g["rss_max_mb"] is not None else f"{'-':>9}"
+        print(f"{filas:>7}{g['paginas']:>9}{g['total_s']:>10.2f}{g['pdf_bytes'] / 1e6:>9.2f}"
+              f"{rss}   {etapas}")
+        for nombre, p in g.get("perfiles", {}).items():
+            b = p["bytes"]
+            print(f"{'':>7}perfil {nombre:<7}{p['total_s']:>7.2f} s{b['total'] / 1e6:>8.2f} MB   "
+                  f"imágenes={b['imagenes'] / 1e6:.2f} fuentes={b['fuentes'] / 1e6:.2f} "
+                  f"vectorial={b['vectorial'] / 1e6:.2f} otros={b['otros'] / 1e6:.2f}")
+        e = caso["extractor"]
+        if "omitido" in e:
+            print(f"{'':>7}extractor omitido: {e['omitido']}")
+        else:
+            etapas = " ".join(f"{k}={v:.2f}" for k, v in e["etapas_s"].items())
+            print(f"{'':>7}extractor {e['paginas']} págs {e['total_s']:.2f} s   {etapas}")
+
+
+def main_benchmark(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de generación y extracción de catálogos.")
+    parser.add_argument("--filas", type=int, nargs="+", default=FILAS_POR_DEFECTO)
+    parser.add_argument("--salida", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--umbral", type=float, default=0.20,
+                        help="empeoramiento tolerado (0.20 = 20%%)")
+    parser.add_argument("--caso", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.caso is not None:
+        print(json.dumps(ejecutar_caso(args.caso)))
+        return 0
+
+    resultados = {"python": sys.version.split()[0], "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                  "casos": {}}
+    for filas in args.filas:
+        print(f"⏱️  {filas} filas...")
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--caso", str(filas)],
+                              capture_output=True, text=True, cwd=BASE_DIR)
+        if proc.returncode != 0:
+            print(proc.stdout + proc.stderr)
+            return 2
+        resultados["casos"][str(filas)] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2)
+    imprimir_resumen(resultados)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regresiones = comparar(resultados, baseline, args.umbral)
+        for clave, antes, ahora in regresiones:
+            print(f"❌ {clave}: {antes:.3f} s -> {ahora:.3f} s (+{100 * (ahora / antes - 1):.0f}%)")
+        if regresiones:
+            return 1
+        print(f"✅ Sin regresiones mayores al {args.umbral:.0%} respecto a {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
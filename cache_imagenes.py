@@ -0,0 +1,135 @@
+# =====================================
+# cache_imagenes.py
+# =====================================
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from PIL import Image
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from archivos import escritura_atomica
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+CACHE_DIR = ".cache_imagenes"
+THUMB_DPI = 200            # resolución de impresión de la foto dentro de la tarjeta
+THUMB_JPEG_QUALITY = 85
+CACHE_MAX_ENTRADAS = 512   # entradas del LRU en memoria
+
+# Caja de la foto dentro de draw_product_card
+CARD_IMAGE_WIDTH = 5.0 * cm
+CARD_IMAGE_HEIGHT = 2.5 * cm
+
+
+# -------------------------------
+# CACHE
+# -------------------------------
+class CacheImagenes:
+    """
+    Cache de imágenes de producto en dos niveles:
+    - LRU en memoria, indexado por (ruta, mtime, tamaño de caja).
+    - Miniaturas en disco ya reducidas a la resolución de impresión (dpi).
+
+    obtener() devuelve la ruta de la miniatura. ReportLab registra las imágenes
+    pasadas por ruta bajo un nombre derivado de esa ruta, así que cada foto se
+    incrusta una sola vez por documento y los JPEG se copian sin decodificar.
+    """
+
+    def __init__(self, dpi=THUMB_DPI, calidad=THUMB_JPEG_QUALITY,
+                 directorio=CACHE_DIR, max_entradas=CACHE_MAX_ENTRADAS):
+        self.dpi = dpi
+        self.calidad = calidad
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, ruta, ancho=CARD_IMAGE_WIDTH, alto=CARD_IMAGE_HEIGHT):
+        """
+        Devuelve la ruta de una versión de `ruta` lista para dibujar en una caja
+        de ancho x alto puntos. Lanza FileNotFoundError si la imagen no existe.
+        """
+        st = os.stat(ruta)
+        clave = (os.path.abspath(ruta), st.st_mtime_ns, st.st_size, round(ancho, 2), round(alto, 2))
+
+        with self._lock:
+            if clave in self._lru:
+                self._lru.move_to_end(clave)
+                self.aciertos += 1
+                return self._lru[clave]
+            self.fallos += 1
+
+        resultado = self._miniatura(ruta, clave, ancho, alto)
+
+        with self._lock:
+            self._lru[clave] = resultado
+            if len(self._lru) > self.max_entradas:
+                self._lru.popitem(last=False)
+        return resultado
+
+    def _miniatura(self, ruta, clave, ancho, alto):
+        max_w = max(1, int(round(ancho / 72.0 * self.dpi)))
+        max_h = max(1, int(round(alto / 72.0 * self.dpi)))
+
+        firma = "|".join(str(p) for p in clave) + f"|{self.dpi}|{self.calidad}"
+        nombre = hashlib.sha1(firma.encode("utf-8")).hexdigest()
+
+        for ext in (".jpg", ".png"):
+            destino = os.path.join(self.directorio, nombre + ext)
+            if os.path.exists(destino):
+                return destino
+
+        with Image.open(ruta) as img:
+            # Si ya cabe en la caja a la resolución pedida, se usa el original tal cual
+            if img.width <= max_w and img.height <= max_h:
+                return ruta
+
+            con_alfa = img.mode in ("RGBA", "LA", "P")
+            img = img.convert("RGBA" if con_alfa else "RGB")
+            img.thumbnail((max_w, max_h), Image.LANCZOS)
+
+            os.makedirs(self.directorio, exist_ok=True)
+            ext = ".png" if con_alfa else ".jpg"
+            destino = os.path.join(self.directorio, nombre + ext)
+            with escritura_atomica(destino) as temporal:
+                if con_alfa:
+                    img.save(temporal, "PNG", optimize=True)
+                else:
+                    img.save(temporal, "JPEG", quality=self.calidad, optimize=True)
+        return destino
+
+    def limpiar(self):
+        """Vacía el LRU en memoria (las miniaturas en disco se conservan)."""
+        with self._lock:
+            self._lru.clear()
+
+
+cache_por_defecto = CacheImagenes()
+
+
+# -------------------------------
+# LOGO E ÍCONOS
+# -------------------------------
+_lectores = {}
+_lock_lectores = threading.Lock()
+
+
+def lector_imagen(ruta):
+    """
+    ImageReader de `ruta` compartido mientras el archivo no cambie (misma
+    fecha y tamaño): el logo y los íconos se decodifican una vez por proceso
+    y no en cada encabezado.
+    """
+    st = os.stat(ruta)
+    clave = (os.path.abspath(ruta), st.st_mtime_ns, st.st_size)
+    with _lock_lectores:
+        lector = _lectores.get(clave)
+        if lector is None:
+            for vieja in [k for k in _lectores if k[0] == clave[0]]:
+                del _lectores[vieja]
+            lector = _lectores[clave] = ImageReader(ruta)
+    return lector
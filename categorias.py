@@ -0,0 +1,189 @@
+# =====================================
+# categorias.py
+# =====================================
+"""
+Catálogo de varias categorías a partir de una sola hoja.
+
+La hoja se lee una vez y las filas se agrupan por la columna de categoría
+en un índice {categoría: productos} armado en la misma pasada. Cada
+categoría es una sección con su propio encabezado de primera página y su
+color. Se pueden generar de dos formas:
+
+    un PDF      todas las secciones seguidas, con un marcador (outline) por
+                categoría y, dentro, uno por página con sus códigos
+    separados   un PDF por categoría, generados en paralelo (un proceso por
+                categoría)
+
+Uso desde la línea de comandos:
+    python cli.py --por-categoria [COLUMNA] [--separados [--workers N]]
+                  [--color-categoria VASOS=#FF8A3D ...]
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from reportlab.lib import colors
+
+import main
+from fuentes import cargar_fuentes
+from encabezados import get_logo_path
+from plantillas import Plantillas
+from maquetacion import obtener_maqueta, planificar
+from perfiles_salida import aplicar, cache_fotos, crear_lienzo, ruta_logo
+from instrumentacion import contar, etapa
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+COLUMNA_CATEGORIA = "categoria"
+SIN_CATEGORIA = "OTROS"
+# Colores de encabezado para las categorías sin color asignado (en orden)
+PALETA = ["#63B7FF", "#FF8A3D", "#4CAF50", "#E94F64", "#9B6BDF", "#F2B705", "#2BB3A3", "#6D7B8D"]
+
+
+# -------------------------------
+# AGRUPACIÓN
+# -------------------------------
+def agrupar(productos):
+    """
+    Índice {categoría: [productos]} armado en una sola pasada, con las
+    categorías en el orden en que aparecen por primera vez en la hoja. La
+    categoría se compara sin espacios sobrantes ni distinguir mayúsculas
+    ("Vasos" y "VASOS " son la sección VASOS), igual que en asignar_colores.
+    """
+    indice = {}
+    for p in productos:
+        indice.setdefault((p.categoria or "").strip().upper() or SIN_CATEGORIA, []).append(p)
+    return indice
+
+
+def asignar_colores(categorias, colores=None):
+    """{categoría: color HEX}: los de `colores` (sin distinguir mayúsculas) y la PALETA para el resto."""
+    pedidos = {k.upper(): v for k, v in (colores or {}).items()}
+    asignados, libres = {}, iter(PALETA * (len(categorias) // len(PALETA) + 1))
+    for categoria in categorias:
+        asignados[categoria] = pedidos.get(categoria.upper()) or next(libres)
+    return asignados
+
+
+def _salidas_categorias(output_file, categorias):
+    """
+    {categoría: <output_file>_<categoría>.pdf}. Las categorías que dan el
+    mismo nombre de archivo ("PLATOS 1" y "PLATOS-1") llevan _2, _3...
+    """
+    base, ext = os.path.splitext(output_file)
+    salidas, usados = {}, set()
+    for categoria in categorias:
+        nombre = re.sub(r"[^A-Za-z0-9]+", "_", categoria).strip("_").lower() or "categoria"
+        candidato, n = nombre, 1
+        while candidato in usados:
+            n += 1
+            candidato = f"{nombre}_{n}"
+        usados.add(candidato)
+        salidas[categoria] = f"{base}_{candidato}{ext or '.pdf'}"
+    return salidas
+
+
+# -------------------------------
+# DIBUJO
+# -------------------------------
+def renderizar_secciones(c, secciones, colores_hex, logo_path, maqueta, imagenes=None,
+                         plantillas=None, progreso=None):
+    """
+    Dibuja en `c` una sección por categoría de `secciones` ({categoría:
+    productos}) y agrega los marcadores del PDF. Devuelve las páginas dibujadas.
+    """
+    planes = {cat: planificar(len(prods), maqueta) for cat, prods in secciones.items()}
+    total = sum(len(plan) for plan in planes.values())
+    hechas = 0
+    if progreso:
+        progreso.iniciar_paginas(total)
+
+    for n, (categoria, productos) in enumerate(secciones.items()):
+        color = colors.HexColor(colores_hex[categoria])
+        envolturas = main.dividir_descripciones(productos)
+        main.reportar_truncados(productos, envolturas)
+
+        def al_cerrar_pagina(pagina, n=n, categoria=categoria, productos=productos):
+            nonlocal hechas
+            if pagina.numero == 0:
+                c.bookmarkPage(f"s{n}")
+                c.addOutlineEntry(f"{categoria} ({len(productos)})", f"s{n}", level=0, closed=True)
+            if pagina.fin > pagina.inicio:
+                clave = f"s{n}p{pagina.numero}"
+                c.bookmarkPage(clave)
+                primero, ultimo = productos[pagina.inicio].codigo, productos[pagina.fin - 1].codigo
+                c.addOutlineEntry(f"Pág. {c.getPageNumber()}: {primero} – {ultimo}", clave, level=1)
+            hechas += 1
+            if progreso:
+                progreso.pagina(hechas, total, main.contar_imagenes(productos, pagina))
+
+        main.renderizar_paginas(c, productos, planes[categoria], categoria, color, logo_path,
+                                imagenes, plantillas, envolturas, al_cerrar_pagina=al_cerrar_pagina,
+                                pagina_tamano=maqueta.pagina)
+    c.showOutline()
+    return total
+
+
+def _generar_seccion(categoria, color_hex, productos, salida, maqueta, usar_plantillas, perfil):
+    """Trabajo de cada proceso en modo separados: un PDF para una categoría."""
+    cargar_fuentes()
+    with aplicar(perfil) as perfil:
+        c = crear_lienzo(salida, maqueta.pagina, perfil)
+        plantillas = Plantillas(c) if usar_plantillas else None
+        renderizar_secciones(c, {categoria: productos}, {categoria: color_hex},
+                             ruta_logo(perfil, get_logo_path()), maqueta, cache_fotos(perfil),
+                             plantillas)
+        c.save()
+    return salida
+
+
+# -------------------------------
+# GENERACIÓN
+# -------------------------------
+def generar_por_categorias(excel_file=None, columna=COLUMNA_CATEGORIA, colores=None,
+                           output_file=None, separados=False, workers=None, maqueta=None,
+                           usar_plantillas=True, imagenes=None, progreso=None, perfil=None):
+    """
+    Genera el catálogo de todas las categorías de `excel_file` según la
+    columna `columna`. `colores` es {categoría: "#RRGGBB"} (el resto toma la
+    PALETA). Con separados=True escribe un PDF por categoría
+    (<output_file>_<categoría>.pdf) usando hasta `workers` procesos (por
+    defecto uno por núcleo). `perfil` es el perfil de salida
+    (perfiles_salida.py). Devuelve la lista de PDFs escritos.
+    """
+    output_file = output_file or main.OUTPUT_FILE
+    maqueta = obtener_maqueta(maqueta or main.MAQUETA)
+    cargar_fuentes()
+    productos = main.leer_productos(excel_file, progreso=progreso, columna_categoria=columna)
+    with etapa("agrupar"):
+        secciones = agrupar(productos)
+    colores_hex = asignar_colores(list(secciones), colores)
+    contar("categorias", len(secciones))
+
+    if separados:
+        salidas = _salidas_categorias(output_file, secciones)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(secciones)))
+        with etapa("dibujo"), ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = [pool.submit(_generar_seccion, cat, colores_hex[cat], prods, salidas[cat],
+                                   maqueta, usar_plantillas, perfil)
+                       for cat, prods in secciones.items()]
+            resultado = [f.result() for f in futuros]
+        if progreso:
+            progreso.fin(", ".join(resultado))
+        print(f"✅ {len(resultado)} catálogos generados (uno por categoría)")
+        return resultado
+
+    imagenes = imagenes or cache_fotos(perfil)
+    with aplicar(perfil) as perfil:
+        c = crear_lienzo(output_file, maqueta.pagina, perfil)
+        plantillas = Plantillas(c) if usar_plantillas else None
+        with etapa("dibujo"):
+            paginas = renderizar_secciones(c, secciones, colores_hex, ruta_logo(perfil, get_logo_path()),
+                                           maqueta, imagenes, plantillas, progreso)
+        with etapa("guardado"):
+            c.save()
+    contar("bytes_escritos", os.path.getsize(output_file))
+    if progreso:
+        progreso.fin(output_file)
+    print(f"✅ Catálogo generado: {output_file} ({len(secciones)} categorías, {paginas} páginas)")
+    return [output_file]
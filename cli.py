@@ -0,0 +1,258 @@
+# =====================================
+# cli.py
+# =====================================
+"""
+Generación de catálogos sin interfaz gráfica.
+
+Un catálogo:
+    python cli.py --titulo BOLSAS --color "#63B7FF" [--entrada productos.xlsx]
+                  [--salida catalogo.pdf] [--filtro columna=valor ...]
+                  [--workers N] [--incremental] [--maqueta 4x5] [--progreso]
+                  [--perfil-salida print|screen|mobile] [--reporte-bytes]
+                  [--medir] [--medir-json medicion.json] [--perfil perfil.prof]
+
+Todas las categorías de una hoja (ver categorias.py), en un PDF con
+marcadores o en uno por categoría:
+    python cli.py --por-categoria [COLUMNA] [--separados [--workers N]] [--entrada hoja.xlsx]
+                  [--color-categoria VASOS=#FF8A3D ...]
+
+Varios catálogos en el mismo proceso (fuentes, logo y caché de imágenes
+compartidos):
+    python cli.py --manifiesto lote.json [--concurrentes N]
+
+Con --servicio [URL] los catálogos (--titulo o --manifiesto) se generan en
+el servicio local ya abierto (python servicio.py), que mantiene fuentes,
+logo, fotos y hojas en memoria entre generaciones. El servicio solo escribe
+PDFs dentro de su carpeta y de las que se le pasen con --carpeta-salida.
+
+lote.json es una lista de entradas:
+    [
+      {"titulo": "BOLSAS", "color": "#63B7FF", "entrada": "bolsas.xlsx"},
+      {"titulo": "VASOS", "color": "#FF8A3D", "entrada": "productos.xlsx",
+       "filtro": {"categoria": "VASOS"}, "salida": "vasos.pdf", "maqueta": "4x5",
+       "perfil_salida": "mobile"}
+    ]
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+import main
+from categorias import generar_por_categorias
+import servicio
+from fuentes import cargar_fuentes
+from maquetacion import MAQUETAS, obtener_maqueta
+from perfiles_salida import PERFILES, PERFIL_POR_DEFECTO, imprimir_reporte, obtener_perfil, reporte_bytes
+from progreso import Progreso, a_consola, a_log
+from instrumentacion import Medicion, perfil
+
+# Los eventos de progreso también se registran aquí (nivel INFO)
+logger = logging.getLogger("catalogo")
+
+
+# -------------------------------
+# LOTES
+# -------------------------------
+def _salida_por_defecto(titulo):
+    nombre = re.sub(r"[^A-Za-z0-9]+", "_", titulo).strip("_").lower() or "catalogo"
+    return f"catalogo_{nombre}.pdf"
+
+
+def normalizar_entrada(entrada):
+    """Valida una entrada del manifiesto y completa los valores por defecto."""
+    if not entrada.get("titulo"):
+        raise ValueError(f"Entrada sin 'titulo': {entrada}")
+    return {
+        "titulo": entrada["titulo"],
+        "color": main.leer_color(entrada.get("color", "#63B7FF")),
+        "entrada": entrada.get("entrada") or main.EXCEL_FILE,
+        "salida": entrada.get("salida") or _salida_por_defecto(entrada["titulo"]),
+        "filtro": entrada.get("filtro") or None,
+        "incremental": bool(entrada.get("incremental", False)),
+        "maqueta": obtener_maqueta(entrada.get("maqueta") or main.MAQUETA),
+        "perfil": obtener_perfil(entrada.get("perfil_salida")),
+    }
+
+
+def _progreso(e, consola):
+    oyentes = [a_log(logger)] + ([a_consola()] if consola else [])
+    return Progreso(e["titulo"], oyentes)
+
+
+def _generar(e, workers=None, consola=False):
+    return main.generar_catalogo(e["titulo"], e["color"], output_file=e["salida"],
+                                 workers=workers, incremental=e["incremental"],
+                                 excel_file=e["entrada"], filtro=e["filtro"], maqueta=e["maqueta"],
+                                 progreso=_progreso(e, consola), perfil=e["perfil"])
+
+
+def construir_catalogo(entrada, workers=None, progreso=False):
+    """
+    Genera un catálogo descrito como una entrada del manifiesto, con
+    `workers` procesos (por defecto uno por núcleo). Con progreso=True el
+    avance se imprime en stderr.
+    """
+    return _generar(normalizar_entrada(entrada), workers, progreso)
+
+
+def construir_lote(entradas, concurrentes=1, progreso=False):
+    """
+    Genera todos los catálogos de `entradas` en este proceso y devuelve la
+    lista de PDFs en el mismo orden. Con concurrentes > 1 los catálogos se
+    generan en hilos que comparten fuentes y caché de imágenes, cada uno en
+    un solo proceso; si no, cada catálogo usa todos los núcleos.
+    """
+    entradas = [normalizar_entrada(e) for e in entradas]
+    salidas = [e["salida"] for e in entradas]
+    repetidas = {s for s in salidas if salidas.count(s) > 1}
+    if repetidas:
+        raise ValueError(f"Varias entradas escriben el mismo PDF: {', '.join(sorted(repetidas))}")
+
+    cargar_fuentes()
+    if concurrentes <= 1:
+        return [_generar(e, consola=progreso) for e in entradas]
+    with ThreadPoolExecutor(max_workers=concurrentes) as pool:
+        return list(pool.map(lambda e: _generar(e, workers=1, consola=progreso), entradas))
+
+
+def construir_en_servicio(entradas, url=servicio.URL, progreso=False):
+    """
+    Envía las entradas al servicio local (servicio.py), que las encola y las
+    genera con sus cachés en memoria. Devuelve los PDFs en el mismo orden.
+    """
+    for e in entradas:
+        normalizar_entrada(e)
+    if not servicio.disponible(url):
+        raise RuntimeError(f"No hay un servicio de catálogos en {url} (ábrelo con: python servicio.py)")
+    with ThreadPoolExecutor(max_workers=max(1, min(len(entradas), 8))) as pool:
+        return list(pool.map(lambda e: servicio.generar_remoto(
+            e, _progreso(e, True) if progreso else None, url), entradas))
+
+
+# -------------------------------
+# LÍNEA DE COMANDOS
+# -------------------------------
+def _leer_filtros(pares):
+    filtro = {}
+    for par in pares or []:
+        if "=" not in par:
+            raise ValueError(f"Filtro inválido {par!r}: usa columna=valor")
+        col, valor = par.split("=", 1)
+        filtro[col.strip()] = valor.strip()
+    return filtro or None
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Generador de catálogos PDF sin interfaz.")
+    parser.add_argument("--manifiesto", help="JSON con la lista de catálogos a generar")
+    parser.add_argument("--concurrentes", type=int, default=1,
+                        help="catálogos del manifiesto generados a la vez (hilos)")
+    parser.add_argument("--titulo", help="título / categoría del catálogo")
+    parser.add_argument("--color", default="#63B7FF", help="color HEX del encabezado")
+    parser.add_argument("--entrada", default=None, help="hoja de productos (.xlsx, .csv, .parquet)")
+    parser.add_argument("--salida", default=None, help="PDF de salida")
+    parser.add_argument("--filtro", action="append", metavar="COLUMNA=VALOR",
+                        help="solo filas con ese valor (se puede repetir)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos para dibujar el catálogo (por defecto uno por núcleo; "
+                             "1 = en este proceso)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="redibujar solo las páginas que cambiaron")
+    parser.add_argument("--maqueta", choices=sorted(MAQUETAS), default=None,
+                        help=f"rejilla de tarjetas (por defecto {main.MAQUETA})")
+    parser.add_argument("--perfil-salida", choices=sorted(PERFILES), default=None,
+                        help=f"tamaño del PDF: fotos, logo, compresión y fuentes (por defecto {PERFIL_POR_DEFECTO})")
+    parser.add_argument("--reporte-bytes", action="store_true",
+                        help="al terminar, mostrar cuánto ocupan imágenes, fuentes y vectores en cada PDF")
+    parser.add_argument("--servicio", nargs="?", const=servicio.URL, metavar="URL",
+                        help=f"generar en el servicio local (por defecto {servicio.URL})")
+    parser.add_argument("--progreso", action="store_true",
+                        help="mostrar filas leídas, páginas y tiempo restante en stderr")
+    parser.add_argument("--por-categoria", nargs="?", const="categoria", metavar="COLUMNA",
+                        help="una sección por categoría de la hoja (columna 'categoria' por defecto)")
+    parser.add_argument("--separados", action="store_true",
+                        help="con --por-categoria, un PDF por categoría generados en paralelo")
+    parser.add_argument("--color-categoria", action="append", metavar="CATEGORIA=#HEX",
+                        help="color del encabezado de una categoría (se puede repetir)")
+    parser.add_argument("--medir", action="store_true",
+                        help="imprimir el tiempo de cada etapa y los contadores al terminar")
+    parser.add_argument("--medir-json", metavar="RUTA", help="guardar la medición en JSON")
+    parser.add_argument("--perfil", metavar="RUTA",
+                        help="perfilar la ejecución (.prof con cProfile, .html con pyinstrument)")
+    parser.add_argument("--perfil-motor", choices=["cprofile", "pyinstrument"], default="cprofile")
+    return parser
+
+
+def _leer_colores(pares):
+    colores = {}
+    for par in pares or []:
+        if "=" not in par:
+            raise ValueError(f"Color inválido {par!r}: usa CATEGORIA=#RRGGBB")
+        categoria, valor = (x.strip() for x in par.split("=", 1))
+        main.leer_color(valor)  # valida el formato
+        colores[categoria] = valor if valor.startswith("#") else "#" + valor
+    return colores
+
+
+def _ejecutar(parser, args):
+    if args.por_categoria:
+        return generar_por_categorias(args.entrada, args.por_categoria,
+                                      _leer_colores(args.color_categoria),
+                                      output_file=args.salida, separados=args.separados,
+                                      workers=args.workers or None, maqueta=args.maqueta,
+                                      progreso=_progreso({"titulo": ""}, args.progreso),
+                                      perfil=args.perfil_salida)
+    if args.manifiesto:
+        with open(args.manifiesto, encoding="utf-8") as f:
+            entradas = json.load(f)
+        if args.servicio:
+            return construir_en_servicio(entradas, args.servicio, args.progreso)
+        return construir_lote(entradas, args.concurrentes, args.progreso)
+    if args.titulo:
+        entrada = {"titulo": args.titulo, "color": args.color,
+                   "entrada": args.entrada or main.EXCEL_FILE,
+                   "salida": args.salida or main.OUTPUT_FILE,
+                   "filtro": _leer_filtros(args.filtro), "incremental": args.incremental,
+                   "maqueta": args.maqueta, "perfil_salida": args.perfil_salida}
+        if args.servicio:
+            return construir_en_servicio([entrada], args.servicio, args.progreso)
+        return [construir_catalogo(entrada, workers=args.workers or None, progreso=args.progreso)]
+    parser.error("indica --titulo, --manifiesto o --por-categoria")
+
+
+def main_cli(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter()
+    medicion = Medicion("cli") if args.medir or args.medir_json else None
+
+    try:
+        with ExitStack() as pila:
+            if medicion:
+                pila.enter_context(medicion)
+            if args.perfil:
+                pila.enter_context(perfil(args.perfil, args.perfil_motor))
+            salidas = _ejecutar(parser, args)
+    except (ValueError, OSError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.reporte_bytes:
+        for salida in salidas:
+            print(f"📄 {salida}")
+            imprimir_reporte(reporte_bytes(salida))
+    if medicion:
+        medicion.imprimir()
+        if args.medir_json:
+            medicion.guardar_json(args.medir_json)
+    print(f"✅ {len(salidas)} catálogo(s) en {time.perf_counter() - t0:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
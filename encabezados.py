@@ -2,53 +2,25 @@
 # encabezados.py
 # =====================================
 from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
-from reportlab.lib.utils import ImageReader
-import os
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+import os
+from fuentes import get_font_name
+from cache_imagenes import lector_imagen
 
 # -------------------------------
 # CONFIG
 # -------------------------------
 LOGO_FILE_NAMES = ["logo2.png", "insumosparatodo_logo.png"]
-CANVA_SANS_BOLD = "fuentes/CanvaSans-Bold.ttf"
-CANVA_SANS_REGULAR = "fuentes/CanvaSans-Regular.ttf"
 
-PAGE_WIDTH, PAGE_HEIGHT = (595.27, 841.89)  # A4 en puntos
+FIRST_HEADER_WIDTH = 17.6 * cm
+FIRST_HEADER_MARGIN_RIGHT = 2 * cm  # mínimo hasta el borde derecho en páginas angostas
+TITLE_GAP = 0.2 * cm  # separación mínima entre el bloque del logo y los títulos
 FIRST_HEADER_HEIGHT = 7.3 * cm
 OTHER_HEADER_HEIGHT = 2 * cm
 
 
-# -------------------------------
-# FUENTES
-# -------------------------------
-def cargar_fuentes():
-    try:
-        os.makedirs("fuentes", exist_ok=True)
-        if os.path.exists(CANVA_SANS_REGULAR):
-            pdfmetrics.registerFont(TTFont('CanvaSans', CANVA_SANS_REGULAR))
-        if os.path.exists(CANVA_SANS_BOLD):
-            pdfmetrics.registerFont(TTFont('CanvaSans-Bold', CANVA_SANS_BOLD))
-    except Exception as e:
-        print(f"⚠️ Error al cargar fuentes: {e}")
-
-
-def get_font_name(style='regular'):
-    if style == 'bold':
-        if 'CanvaSans-Bold' in pdfmetrics.getRegisteredFontNames():
-            return 'CanvaSans-Bold'
-        elif 'CanvaSans' in pdfmetrics.getRegisteredFontNames():
-            return 'CanvaSans'
-        else:
-            return 'Helvetica-Bold'
-    else:
-        if 'CanvaSans' in pdfmetrics.getRegisteredFontNames():
-            return 'CanvaSans'
-        else:
-            return 'Helvetica'
-
-
 # -------------------------------
 # LOGO
 # -------------------------------
@@ -94,7 +66,7 @@ def draw_logo_block(c, x, y, h, logo_path):
 
     if logo_path and os.path.exists(logo_path):
         try:
-            img = ImageReader(logo_path)
+            img = lector_imagen(logo_path)
             c.drawImage(img, inner_x, inner_y,
                         width=inner_w, height=inner_h,
                         preserveAspectRatio=True, mask='auto')
@@ -108,22 +80,42 @@ def draw_logo_block(c, x, y, h, logo_path):
     c.drawCentredString(inner_x + inner_w / 2, inner_y + inner_h / 2 - 4, "INSUMOSPARA:TODO")
 
 
+def draw_title(c, text, size, x_center, y, limits=None):
+    """
+    Escribe `text` centrado en x_center. Con limits=(x_min, x_max) (páginas
+    más angostas que A4) lo corre y, si no cabe, lo achica para que quede
+    entre el bloque del logo y el borde del fondo.
+    """
+    font = get_font_name('bold')
+    if limits:
+        x_min, x_max = limits
+        width = pdfmetrics.stringWidth(text, font, size)
+        if width > x_max - x_min:
+            size *= (x_max - x_min) / width
+            width = x_max - x_min
+        x_center = min(max(x_center, x_min + width / 2), x_max - width / 2)
+    c.setFont(font, size)
+    c.drawCentredString(x_center, y, text)
+
+
 # -------------------------------
 # ENCABEZADOS
 # -------------------------------
-def draw_header_page1(c, category_text, header_color, logo_path):
+def draw_header_page1(c, category_text, header_color, logo_path, pagina=A4):
     """
-    Dibuja el encabezado de la primera página:
+    Dibuja el encabezado de la primera página, pegado al borde superior de
+    una página de tamaño `pagina` (ancho, alto) en puntos:
     - Fondo recto perfectamente alineado.
     - Solo la esquina INFERIOR DERECHA queda redondeada.
     - Bloque negro con logo pegado en la esquina superior izquierda.
     - Franja negra inferior con borde derecho puntiagudo.
     """
+    page_w, page_h = pagina
     header_h = FIRST_HEADER_HEIGHT
-    fondo_w = 17.6 * cm
     fondo_h = header_h + 1 * cm
     fondo_x = 1.3 * cm
-    fondo_y = PAGE_HEIGHT - fondo_h + 1 * cm
+    fondo_w = min(FIRST_HEADER_WIDTH, page_w - fondo_x - FIRST_HEADER_MARGIN_RIGHT)
+    fondo_y = page_h - fondo_h + 1 * cm
 
     # Radio del redondeo
     radius = 25
@@ -133,24 +125,28 @@ def draw_header_page1(c, category_text, header_color, logo_path):
     c.roundRect(fondo_x, fondo_y, fondo_w, fondo_h, radius, fill=1, stroke=0)
 
     # Recuadrar esquinas que no deben redondearse
-    c.rect(fondo_x, PAGE_HEIGHT - radius, radius, radius, fill=1, stroke=0)
-    c.rect(fondo_x + fondo_w - radius, PAGE_HEIGHT - radius, radius, radius, fill=1, stroke=0)
+    c.rect(fondo_x, page_h - radius, radius, radius, fill=1, stroke=0)
+    c.rect(fondo_x + fondo_w - radius, page_h - radius, radius, radius, fill=1, stroke=0)
     c.rect(fondo_x, fondo_y, radius, radius, fill=1, stroke=0)
 
     # Bloque negro con logo
-    draw_logo_block(c, 0 * cm, fondo_y + 3 * cm, fondo_h * 0.60 , logo_path)
+    logo_h = fondo_h * 0.60
+    draw_logo_block(c, 0 * cm, fondo_y + 3 * cm, logo_h, logo_path)
 
-    # Títulos
+    # Títulos (en páginas angostas, entre el logo y el borde del fondo)
+    limits = None
+    if fondo_w < FIRST_HEADER_WIDTH:
+        limits = (logo_h * 1.2 + TITLE_GAP, fondo_x + fondo_w - TITLE_GAP)
     c.setFillColor(colors.white)
-    c.setFont(get_font_name('bold'), 40)
-    c.drawCentredString(fondo_x + (fondo_w / 2) + 0.5 * cm, PAGE_HEIGHT - fondo_h / 2 + 1.8 * cm, "CATÁLOGO")
-    c.setFont(get_font_name('bold'), 64)
-    c.drawCentredString(fondo_x + (fondo_w / 2) + 0.25 * cm, PAGE_HEIGHT - fondo_h / 2 - 0.9 * cm, category_text.upper())
+    draw_title(c, "CATÁLOGO", 40, fondo_x + (fondo_w / 2) + 0.5 * cm,
+               page_h - fondo_h / 2 + 1.8 * cm, limits)
+    draw_title(c, category_text.upper(), 64, fondo_x + (fondo_w / 2) + 0.25 * cm,
+               page_h - fondo_h / 2 - 0.9 * cm, limits)
 
     # -------------------------------
     # Franja negra inferior con punta
     # -------------------------------
-    franja_w = 11.5 * cm
+    franja_w = min(11.5 * cm, fondo_w - 0.5 * cm)
     franja_h = 0.9 * cm
     franja_x = fondo_x
     franja_y = fondo_y
@@ -180,9 +176,9 @@ def draw_header_page1(c, category_text, header_color, logo_path):
 
     return fondo_h
 
-def draw_header_pageN(c, category_text, header_color, logo_path):
+def draw_header_pageN(c, category_text, header_color, logo_path, pagina=A4):
     """
-    Encabezado de páginas siguientes:
+    Encabezado de páginas siguientes (página de tamaño `pagina`, en puntos):
     - Franja del color del usuario (no ocupa toda la página, deja 4 cm antes del borde derecho).
     - Solo la esquina inferior derecha está redondeada.
     - Bloque negro con el logo, pegado a la esquina superior izquierda y más ancho.
@@ -190,23 +186,24 @@ def draw_header_pageN(c, category_text, header_color, logo_path):
     - Logo más grande dentro del bloque.
     - Texto centrado con el nombre de la categoría.
     """
+    page_w, page_h = pagina
     h = OTHER_HEADER_HEIGHT
 
     # -----------------------------
     # Fondo del encabezado
     # -----------------------------
     fondo_margin_right = 4 * cm
-    fondo_w = PAGE_WIDTH - fondo_margin_right
+    fondo_w = page_w - fondo_margin_right
     fondo_x = 1.8 * cm
-    fondo_y = PAGE_HEIGHT - h
+    fondo_y = page_h - h
     radius = 20
 
     c.setFillColor(header_color)
     c.roundRect(fondo_x, fondo_y, fondo_w, h, radius, fill=1, stroke=0)
 
     # Recuadrar las esquinas que no deben ser redondeadas
-    c.rect(fondo_x, PAGE_HEIGHT - radius, radius, radius, fill=1, stroke=0)
-    c.rect(fondo_x + fondo_w - radius, PAGE_HEIGHT - radius, radius, radius, fill=1, stroke=0)
+    c.rect(fondo_x, page_h - radius, radius, radius, fill=1, stroke=0)
+    c.rect(fondo_x + fondo_w - radius, page_h - radius, radius, radius, fill=1, stroke=0)
     c.rect(fondo_x, fondo_y, radius, radius, fill=1, stroke=0)
 
     # -----------------------------
@@ -215,7 +212,7 @@ def draw_header_pageN(c, category_text, header_color, logo_path):
     block_h = h
     block_w = block_h * 2.7
     block_x = 0
-    block_y = PAGE_HEIGHT - block_h
+    block_y = page_h - block_h
 
     # 🔸 Punta menos aguda (0.9 → más corta)
     pts = [
@@ -244,7 +241,7 @@ def draw_header_pageN(c, category_text, header_color, logo_path):
 
     if logo_path and os.path.exists(logo_path):
         try:
-            img = ImageReader(logo_path)
+            img = lector_imagen(logo_path)
             c.drawImage(img, inner_x, inner_y,
                         width=inner_w, height=inner_h,
                         preserveAspectRatio=True, mask='auto')
@@ -258,8 +255,10 @@ def draw_header_pageN(c, category_text, header_color, logo_path):
     # -----------------------------
     # Texto centrado (categoría)
     # -----------------------------
+    limits = None
+    if page_w < A4[0]:
+        limits = (block_x + block_w * 0.95 + TITLE_GAP, fondo_x + fondo_w - TITLE_GAP)
     c.setFillColor(colors.white)
-    c.setFont(get_font_name('bold'), 45)
-    c.drawCentredString(PAGE_WIDTH / 2, PAGE_HEIGHT - h / 2 - 15, category_text.upper())
+    draw_title(c, category_text.upper(), 45, page_w / 2, page_h - h / 2 - 15, limits)
 
     return h
\ No newline at end of file
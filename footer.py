@@ -2,79 +2,49 @@
 # footer.py
 # =====================================
 from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
-from reportlab.lib.utils import ImageReader
 import os
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from fuentes import get_font_name
+from cache_imagenes import lector_imagen
 
 # -------------------------------
 # CONFIG
 # -------------------------------
 INSTAGRAM_ICON = "instagram.png"  # Ícono en la carpeta raíz del programa
-CANVA_SANS_BOLD = "fuentes/CanvaSans-Bold.ttf"
-CANVA_SANS_REGULAR = "fuentes/CanvaSans-Regular.ttf"
 
 # Tamaño del footer
 FOOTER_WIDTH = 16 * cm   # más ancho
 FOOTER_HEIGHT = 1.3 * cm  # más bajo
-
-
-# -------------------------------
-# FUENTES
-# -------------------------------
-def cargar_fuentes_footer():
-    """Carga las fuentes necesarias si están disponibles."""
-    try:
-        os.makedirs("fuentes", exist_ok=True)
-        if os.path.exists(CANVA_SANS_REGULAR):
-            pdfmetrics.registerFont(TTFont('CanvaSans', CANVA_SANS_REGULAR))
-        if os.path.exists(CANVA_SANS_BOLD):
-            pdfmetrics.registerFont(TTFont('CanvaSans-Bold', CANVA_SANS_BOLD))
-    except Exception as e:
-        print(f"⚠️ Error al cargar fuentes (footer): {e}")
-
-
-def get_font_name(style='regular'):
-    if style == 'bold':
-        if 'CanvaSans-Bold' in pdfmetrics.getRegisteredFontNames():
-            return 'CanvaSans-Bold'
-        elif 'CanvaSans' in pdfmetrics.getRegisteredFontNames():
-            return 'CanvaSans'
-        else:
-            return 'Helvetica-Bold'
-    else:
-        if 'CanvaSans' in pdfmetrics.getRegisteredFontNames():
-            return 'CanvaSans'
-        else:
-            return 'Helvetica'
+FOOTER_MARGIN_RIGHT = 2 * cm  # mínimo hasta el borde derecho en páginas angostas
 
 
 # -------------------------------
 # FOOTER
 # -------------------------------
-def draw_footer(c, header_color):
+def draw_footer(c, header_color, pagina=A4):
     """
-    Dibuja un footer en la parte inferior de la página:
+    Dibuja un footer en la parte inferior de una página de tamaño `pagina`
+    (ancho, alto) en puntos:
     - Bloque del mismo color que el encabezado.
     - Solo la esquina superior derecha redondeada.
     - Ícono de Instagram centrado junto con el texto '@insumosparatodo'.
     """
-    cargar_fuentes_footer()
-
     # Posición del footer (pegado a la esquina inferior izquierda)
     footer_x = 0 * cm
     footer_y = 0 * cm
+    footer_w = min(FOOTER_WIDTH, pagina[0] - FOOTER_MARGIN_RIGHT)
     radius = 15  # radio del redondeo
 
     # Fondo del footer (usa el color del encabezado)
     c.setFillColor(header_color)
-    c.roundRect(footer_x, footer_y, FOOTER_WIDTH, FOOTER_HEIGHT, radius, fill=1, stroke=0)
+    c.roundRect(footer_x, footer_y, footer_w, FOOTER_HEIGHT, radius, fill=1, stroke=0)
 
     # “Rectificar” las esquinas que no deben redondearse (todas menos la sup. derecha)
     c.rect(footer_x, footer_y, radius, radius, fill=1, stroke=0)  # inf izq
     c.rect(footer_x, footer_y + FOOTER_HEIGHT - radius, radius, radius, fill=1, stroke=0)  # sup izq
-    c.rect(footer_x + FOOTER_WIDTH - radius, footer_y, radius, radius, fill=1, stroke=0)  # inf der
+    c.rect(footer_x + footer_w - radius, footer_y, radius, radius, fill=1, stroke=0)  # inf der
 
     # Dimensiones del ícono
     icon_size = 1.3 * cm
@@ -89,7 +59,7 @@ def draw_footer(c, header_color):
     total_width = icon_size + spacing + text_width
 
     # Posicionar conjunto centrado dentro del footer
-    start_x = footer_x + (FOOTER_WIDTH - total_width) / 2
+    start_x = footer_x + (footer_w - total_width) / 2
     icon_x = start_x
     text_x = icon_x + icon_size + spacing
 
@@ -100,7 +70,7 @@ def draw_footer(c, header_color):
     # Dibujar el ícono
     if os.path.exists(INSTAGRAM_ICON):
         try:
-            img = ImageReader(INSTAGRAM_ICON)
+            img = lector_imagen(INSTAGRAM_ICON)
             c.drawImage(img, icon_x, icon_y, width=icon_size, height=icon_size,
                         preserveAspectRatio=True, mask='auto')
         except Exception as e:
@@ -0,0 +1,84 @@
+# =====================================
+# fuentes.py
+# =====================================
+import os
+import threading
+from contextlib import contextmanager
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+CANVA_SANS_BOLD = "fuentes/CanvaSans-Bold.ttf"
+CANVA_SANS_REGULAR = "fuentes/CanvaSans-Regular.ttf"
+
+FUENTES_TTF = {
+    'CanvaSans': CANVA_SANS_REGULAR,
+    'CanvaSans-Bold': CANVA_SANS_BOLD,
+}
+
+# Cadena de respaldo por estilo: se usa la primera fuente registrada.
+# La última de cada cadena es una fuente estándar de PDF y siempre existe.
+CADENAS_RESPALDO = {
+    'bold': ['CanvaSans-Bold', 'CanvaSans', 'Helvetica-Bold'],
+    'regular': ['CanvaSans', 'Helvetica'],
+}
+
+# Solo fuentes estándar de PDF (no se incrustan en el archivo)
+ESTANDAR = {estilo: cadena[-1] for estilo, cadena in CADENAS_RESPALDO.items()}
+
+_lock = threading.Lock()
+_nombres = {}
+_hilo = threading.local()
+
+
+# -------------------------------
+# REGISTRO
+# -------------------------------
+def cargar_fuentes():
+    """
+    Registra las fuentes TTF una sola vez por proceso y resuelve la cadena de
+    respaldo de cada estilo. Las llamadas siguientes no hacen nada.
+    """
+    if _nombres:
+        return
+    with _lock:
+        if _nombres:
+            return
+        try:
+            os.makedirs("fuentes", exist_ok=True)
+            registradas = set(pdfmetrics.getRegisteredFontNames())
+            for nombre, ruta in FUENTES_TTF.items():
+                if nombre not in registradas and os.path.exists(ruta):
+                    pdfmetrics.registerFont(TTFont(nombre, ruta))
+        except Exception as e:
+            print(f"⚠️ Error al cargar fuentes: {e}")
+
+        registradas = set(pdfmetrics.getRegisteredFontNames())
+        resueltos = {}
+        for estilo, cadena in CADENAS_RESPALDO.items():
+            resueltos[estilo] = next((n for n in cadena[:-1] if n in registradas), cadena[-1])
+        _nombres.update(resueltos)
+
+
+@contextmanager
+def solo_estandar(activo=True):
+    """
+    Mientras dure el bloque, get_font_name() devuelve en este hilo las
+    fuentes estándar de PDF (Helvetica), que no se incrustan en el archivo.
+    """
+    anterior = getattr(_hilo, "estandar", False)
+    _hilo.estandar = activo
+    try:
+        yield
+    finally:
+        _hilo.estandar = anterior
+
+
+def get_font_name(style='regular'):
+    if getattr(_hilo, "estandar", False):
+        return ESTANDAR['bold'] if style == 'bold' else ESTANDAR['regular']
+    if not _nombres:
+        cargar_fuentes()
+    return _nombres['bold'] if style == 'bold' else _nombres['regular']
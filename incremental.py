@@ -0,0 +1,171 @@
+# =====================================
+# incremental.py
+# =====================================
+"""
+Generación incremental del catálogo.
+
+Cada página se identifica por una huella (sha256) de todo lo que influye en
+su dibujo: productos de la página, fecha y tamaño de sus imágenes, título,
+color, si es la primera página y los archivos del programa (código, fuentes,
+logo). Las páginas ya dibujadas se guardan como PDF de una página en
+<OUTPUT_FILE>.paginas/ y el manifiesto <OUTPUT_FILE>.manifest.json guarda
+las huellas de la última generación. Solo se redibujan las páginas cuya
+huella no figura en ese manifiesto; el resto se reutiliza y todo se une
+con pypdf.
+"""
+import hashlib
+import json
+import os
+
+import main
+from fuentes import cargar_fuentes, CANVA_SANS_BOLD, CANVA_SANS_REGULAR
+from encabezados import get_logo_path
+from footer import INSTAGRAM_ICON
+from plantillas import Plantillas
+from maquetacion import obtener_maqueta, planificar
+from perfiles_salida import aplicar, cache_fotos, crear_lienzo, obtener_perfil, ruta_logo
+from instrumentacion import contar, etapa
+from archivos import escritura_atomica
+
+MANIFEST_VERSION = 3
+
+# Archivos cuyo cambio obliga a redibujar todas las páginas
+ARCHIVOS_PROGRAMA = [
+    "main.py", "encabezados.py", "footer.py", "plantillas.py", "texto.py", "fuentes.py",
+    "productos.py", "cache_imagenes.py", "maquetacion.py", "perfiles_salida.py",
+    "revision_imagenes.py", "almacen_imagenes.py",
+    CANVA_SANS_BOLD, CANVA_SANS_REGULAR, INSTAGRAM_ICON,
+]
+
+
+# -------------------------------
+# HUELLAS
+# -------------------------------
+def _firma_archivo(ruta):
+    try:
+        st = os.stat(ruta)
+        return f"{ruta}:{st.st_mtime_ns}:{st.st_size}"
+    except OSError:
+        return f"{ruta}:-"
+
+
+def huella_entorno(category_text, header_color, logo_path, usar_plantillas, maqueta, perfil):
+    """Huella común a todas las páginas de una generación."""
+    h = hashlib.sha256()
+    partes = [str(MANIFEST_VERSION), category_text, header_color.hexval(),
+              _firma_archivo(logo_path), str(bool(usar_plantillas)), repr(maqueta), repr(perfil)]
+    base = os.path.dirname(os.path.abspath(__file__))
+    partes += [_firma_archivo(os.path.join(base, a) if a.endswith(".py") else a)
+               for a in ARCHIVOS_PROGRAMA]
+    h.update("\n".join(partes).encode("utf-8"))
+    return h.hexdigest()
+
+
+def huella_pagina(entorno, pagina, productos_pagina):
+    h = hashlib.sha256()
+    h.update(entorno.encode("ascii"))
+    # Solo importa si es la primera página (encabezado grande) y si lleva pie, no su número
+    h.update(b"P1" if pagina.numero == 0 else b"PN")
+    h.update(b"F" if pagina.footer else b"-")
+    for p in productos_pagina:
+        h.update("\x1f".join((p.codigo, p.descripcion, _firma_archivo(p.imagen))).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+# -------------------------------
+# MANIFIESTO
+# -------------------------------
+def ruta_manifiesto(output_file):
+    return output_file + ".manifest.json"
+
+
+def carpeta_paginas(output_file):
+    return output_file + ".paginas"
+
+
+def leer_manifiesto(output_file):
+    try:
+        with open(ruta_manifiesto(output_file), encoding="utf-8") as f:
+            datos = json.load(f)
+        if datos.get("version") == MANIFEST_VERSION:
+            return datos
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "paginas": []}
+
+
+def guardar_manifiesto(output_file, huellas):
+    with escritura_atomica(ruta_manifiesto(output_file)) as temporal:
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "paginas": huellas}, f, indent=1)
+
+
+# -------------------------------
+# GENERACIÓN
+# -------------------------------
+def generar_incremental(category_text, header_color, output_file=None, imagenes=None,
+                        usar_plantillas=True, excel_file=None, filtro=None, maqueta=None,
+                        progreso=None, perfil=None):
+    """
+    Igual que main.generar_catalogo, pero redibujando solo las páginas que
+    cambiaron desde la última generación. Devuelve (redibujadas, total).
+    Con `progreso` se emite un evento por página, redibujada o reutilizada.
+    """
+    from paralelo import unir_pdfs
+
+    output_file = output_file or main.OUTPUT_FILE
+    maqueta = obtener_maqueta(maqueta or main.MAQUETA)
+    perfil = obtener_perfil(perfil)
+    cargar_fuentes()
+    logo_path = ruta_logo(perfil, get_logo_path())
+    imagenes = imagenes or cache_fotos(perfil)
+    productos = main.leer_productos(excel_file, filtro, progreso)
+    paginas = planificar(len(productos), maqueta)
+    with aplicar(perfil):
+        envolturas = main.dividir_descripciones(productos)
+    main.reportar_truncados(productos, envolturas)
+
+    entorno = huella_entorno(category_text, header_color, get_logo_path(), usar_plantillas,
+                             maqueta, perfil)
+    carpeta = carpeta_paginas(output_file)
+    os.makedirs(carpeta, exist_ok=True)
+
+    anteriores = set(leer_manifiesto(output_file)["paginas"])
+    huellas, archivos, redibujadas = [], [], 0
+    if progreso:
+        progreso.iniciar_paginas(len(paginas))
+    for pagina in paginas:
+        huella = huella_pagina(entorno, pagina, productos[pagina.inicio:pagina.fin])
+        archivo = os.path.join(carpeta, f"{huella}.pdf")
+        if huella not in anteriores or not os.path.exists(archivo):
+            with escritura_atomica(archivo) as temporal, aplicar(perfil):
+                c = crear_lienzo(temporal, maqueta.pagina, perfil)
+                plantillas = Plantillas(c) if usar_plantillas else None
+                with etapa("dibujo"):
+                    main.renderizar_paginas(c, productos, [pagina], category_text,
+                                            header_color, logo_path, imagenes, plantillas, envolturas,
+                                            pagina_tamano=maqueta.pagina)
+                with etapa("guardado"):
+                    c.save()
+            redibujadas += 1
+        huellas.append(huella)
+        archivos.append(archivo)
+        if progreso:
+            progreso.pagina(len(archivos), len(paginas), main.contar_imagenes(productos, pagina))
+
+    unir_pdfs(archivos, output_file)
+    guardar_manifiesto(output_file, huellas)
+    contar("paginas_reutilizadas", len(paginas) - redibujadas)
+    contar("bytes_escritos", os.path.getsize(output_file))
+
+    # Borrar páginas en caché que ya no forman parte del catálogo
+    vigentes = set(huellas)
+    for nombre in os.listdir(carpeta):
+        if nombre.endswith(".pdf") and nombre[:-4] not in vigentes:
+            os.remove(os.path.join(carpeta, nombre))
+
+    if progreso:
+        progreso.fin(output_file)
+    print(f"✅ Catálogo generado: {output_file} ({redibujadas}/{len(paginas)} páginas redibujadas)")
+    return redibujadas, len(paginas)
@@ -0,0 +1,178 @@
+# =====================================
+# instrumentacion.py
+# =====================================
+"""
+Tiempos por etapa y contadores de una ejecución del generador o del extractor.
+
+    from instrumentacion import Medicion, etapa, contar
+
+    with Medicion("catalogo") as m:        # activa la medición
+        with etapa("carga"):               # suma el tiempo a la etapa "carga"
+            ...
+        contar("imagenes", 3)
+    m.imprimir()                           # tabla de etapas y contadores
+    m.guardar_json("medicion.json")
+
+Las etapas pueden anidarse (en el generador "dibujo" incluye "imagenes" y
+"encabezados"), así que los porcentajes no suman 100. Sin una Medicion
+activa, etapa(), contar() y @cronometrado no hacen nada, así que se pueden
+dejar en el código sin costo. La medición activa es una por
+proceso (las etapas de hilos paralelos se suman en ella); para los procesos
+del pool, resumen() de cada uno se suma con fusionar(). En ambos casos una
+etapa puede pasar del 100 % del tiempo total.
+
+perfil() envuelve un bloque con cProfile (o pyinstrument si está instalado y
+se pide) para ver el detalle por función.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+_activa = None
+
+
+class Medicion:
+    def __init__(self, nombre=""):
+        self.nombre = nombre
+        self.etapas = {}       # nombre -> [segundos, llamadas]
+        self.contadores = {}
+        self.total = 0.0
+        self._lock = threading.Lock()
+        self._inicio = None
+        self._anterior = None
+
+    # --- activación ---
+    def __enter__(self):
+        global _activa
+        self._anterior, _activa = _activa, self
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _activa
+        self.total += time.perf_counter() - self._inicio
+        _activa = self._anterior
+
+    # --- registro ---
+    def sumar(self, nombre, segundos, llamadas=1):
+        with self._lock:
+            acumulado = self.etapas.setdefault(nombre, [0.0, 0])
+            acumulado[0] += segundos
+            acumulado[1] += llamadas
+
+    def contar(self, nombre, n=1):
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def fusionar(self, resumen):
+        """Suma las etapas y contadores de otro resumen() (p. ej. de un proceso hijo)."""
+        for nombre, datos in resumen.get("etapas", {}).items():
+            self.sumar(nombre, datos["s"], datos["llamadas"])
+        for nombre, n in resumen.get("contadores", {}).items():
+            self.contar(nombre, n)
+
+    # --- salida ---
+    def resumen(self):
+        return {
+            "nombre": self.nombre,
+            "total_s": round(self.total, 6),
+            "etapas": {n: {"s": round(s, 6), "llamadas": k} for n, (s, k) in self.etapas.items()},
+            "contadores": dict(self.contadores),
+        }
+
+    def imprimir(self, salida=None):
+        print(f"\n⏱️ {self.nombre or 'Medición'}: {self.total:.3f} s", file=salida)
+        print(f"   {'etapa':<22}{'s':>10}{'%':>8}{'llamadas':>10}", file=salida)
+        for nombre, (s, k) in sorted(self.etapas.items(), key=lambda e: -e[1][0]):
+            pct = 100 * s / self.total if self.total else 0
+            print(f"   {nombre:<22}{s:>10.3f}{pct:>8.1f}{k:>10}", file=salida)
+        for nombre, n in sorted(self.contadores.items()):
+            print(f"   {nombre:<22}{n:>10}", file=salida)
+
+    def guardar_json(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.resumen(), f, indent=2, ensure_ascii=False)
+        return ruta
+
+
+# -------------------------------
+# API DE INSTRUMENTACIÓN
+# -------------------------------
+def activa():
+    """La Medicion activa, o None."""
+    return _activa
+
+
+@contextmanager
+def _cronometro(m, nombre):
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        m.sumar(nombre, time.perf_counter() - t)
+
+
+def etapa(nombre):
+    """Context manager que suma el tiempo del bloque a la etapa `nombre`."""
+    m = _activa
+    return _cronometro(m, nombre) if m is not None else nullcontext()
+
+
+def contar(nombre, n=1):
+    m = _activa
+    if m is not None:
+        m.contar(nombre, n)
+
+
+def cronometrado(nombre):
+    """Decorador: cada llamada a la función suma su tiempo a la etapa `nombre`."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+# -------------------------------
+# PERFILADO
+# -------------------------------
+@contextmanager
+def perfil(destino=None, motor="cprofile", lineas=25):
+    """
+    Perfila el bloque con cProfile (motor="cprofile") o pyinstrument
+    (motor="pyinstrument", pip install pyinstrument). Imprime las funciones
+    más costosas y, si se da `destino`, guarda el perfil (.prof para
+    cProfile, .html para pyinstrument).
+    """
+    if motor == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise RuntimeError("Para perfilar con pyinstrument instálalo: pip install pyinstrument")
+        perfilador = Profiler()
+        perfilador.start()
+        try:
+            yield perfilador
+        finally:
+            perfilador.stop()
+            print(perfilador.output_text(unicode=True))
+            if destino:
+                with open(destino, "w", encoding="utf-8") as f:
+                    f.write(perfilador.output_html())
+        return
+
+    import cProfile
+    import pstats
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield perfilador
+    finally:
+        perfilador.disable()
+        if destino:
+            perfilador.dump_stats(destino)
+        pstats.Stats(perfilador).sort_stats("cumulative").print_stats(lineas)
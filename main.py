@@ -1,57 +1,62 @@
 # =====================================
 # main.py
 # =====================================
-import pandas as pd
 from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
 from reportlab.lib import colors
-from reportlab.lib.utils import ImageReader
-from tkinter import Tk, Label, Entry, Button, colorchooser, messagebox
+import json
 import os
 import re
 from footer import draw_footer
+from fuentes import cargar_fuentes, get_font_name
 from encabezados import (
-    cargar_fuentes,
-    get_font_name,
     draw_header_page1,
     draw_header_pageN,
     get_logo_path
 )
+from cache_imagenes import cache_por_defecto
+from almacen_imagenes import AlmacenImagenes
+from revision_imagenes import validar_imagenes
+from maquetacion import TARJETA_ANCHO, TARJETA_ALTO, obtener_maqueta, planificar
+from perfiles_salida import aplicar, cache_fotos, crear_lienzo, ruta_logo
+from plantillas import Plantillas
+from instrumentacion import contar, cronometrado, etapa
+from productos import cargar_productos, reportar_errores
+import texto as texto_motor
 
 # -------------------------------
 # CONFIG
 # -------------------------------
-EXCEL_FILE = "productos.xlsx"
+EXCEL_FILE = "productos.xlsx"  # también acepta .csv o .parquet
+IMAGES_DIR = "imagenes"          # fotos nombradas en la columna "imagen" de la hoja
+USAR_ALMACEN = True              # si esa foto no existe, usar la del almacén (extractor) por código
+INDICE_RECORTES = os.path.join("images", "index.json")  # código -> recorte (lo escribe el extractor)
 OUTPUT_FILE = "catalogo.pdf"
 PAGE_WIDTH, PAGE_HEIGHT = A4
-PAGE2_START_Y_OFFSET = 6.4 * cm
+CARD_WIDTH = TARJETA_ANCHO
+CARD_HEIGHT = TARJETA_ALTO
+DESC_WIDTH = CARD_WIDTH - 1.2 * cm
+DESC_FONT_SIZE = 9
+DESC_MAX_LINEAS = 3
+
+# Rejilla de tarjetas (ver maquetacion.MAQUETAS): "3x4" = 9 productos en la
+# primera página y 12 en las demás; "4x5" = tarjetas más chicas, 16 y 20
+MAQUETA = "3x4"
+PROGRESO_FILAS = 1000   # cada cuántas filas leídas se emite un evento de progreso
+# productos.CacheHojas para no releer hojas sin cambios (la activa servicio.py)
+CACHE_HOJAS = None
 
 
 # -------------------------------
 # FUNCIONES DE TEXTO Y TARJETAS
 # -------------------------------
 def dividir_texto_en_lineas(texto, ancho_max, fuente, tamaño_fuente, max_lineas=2):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    palabras = str(texto).split()
-    lineas, linea_actual = [], ""
-    for palabra in palabras:
-        prueba_linea = linea_actual + " " + palabra if linea_actual else palabra
-        if stringWidth(prueba_linea, fuente, tamaño_fuente) <= ancho_max:
-            linea_actual = prueba_linea
-        else:
-            if linea_actual:
-                lineas.append(linea_actual)
-            linea_actual = palabra
-            if len(lineas) >= max_lineas:
-                break
-    if linea_actual and len(lineas) < max_lineas:
-        lineas.append(linea_actual)
-    return lineas[:max_lineas]
-
-
-def dibujar_texto_con_saltos(c, x, y, texto, ancho_max, fuente, tamaño_fuente, max_lineas=2):
-    lineas = dividir_texto_en_lineas(texto, ancho_max, fuente, tamaño_fuente, max_lineas)
+    return list(texto_motor.dividir(str(texto), ancho_max, fuente, tamaño_fuente, max_lineas).lineas)
+
+
+def dibujar_texto_con_saltos(c, x, y, texto, ancho_max, fuente, tamaño_fuente, max_lineas=2, lineas=None):
+    if lineas is None:
+        lineas = dividir_texto_en_lineas(texto, ancho_max, fuente, tamaño_fuente, max_lineas)
     c.setFont(fuente, tamaño_fuente)
     espaciado = tamaño_fuente * 0.9
     for i, linea in enumerate(lineas):
@@ -75,90 +80,293 @@ def draw_triangle(c, x, y, size, color):
     c.drawPath(path, fill=1, stroke=0)
 
 
-def draw_product_card(c, x, y, producto, triangle_color):
-    card_width = 6.0 * cm
-    card_height = 6.0 * cm
+def draw_card_chrome(c, x, y, triangle_color):
+    """Parte fija de la tarjeta: marco, fondo del código y triángulo."""
     c.setStrokeColor(colors.black)
-    c.rect(x, y, card_width, card_height)
+    c.rect(x, y, CARD_WIDTH, CARD_HEIGHT)
+    draw_code_background(c, x, y, CARD_WIDTH, CARD_HEIGHT)
+    draw_triangle(c, x + CARD_WIDTH, y, 1.4 * cm, triangle_color)
 
-    draw_code_background(c, x, y, card_width, card_height)
+
+def draw_product_card(c, x, y, producto, triangle_color, imagenes=None, plantillas=None,
+                      lineas_descripcion=None):
+    card_width = CARD_WIDTH
+    card_height = CARD_HEIGHT
+    if plantillas:
+        plantillas.card_chrome(x, y, triangle_color, draw_card_chrome, card_width, card_height)
+    else:
+        draw_card_chrome(c, x, y, triangle_color)
 
     c.setFillColor(colors.white)
     c.setFont(get_font_name('bold'), 13)
-    c.drawCentredString(x + 2.5 * cm, y + card_height - 0.5 * cm, producto.get("codigo", ""))
+    c.drawCentredString(x + 2.5 * cm, y + card_height - 0.5 * cm, producto.codigo)
 
     descripcion_x = x + card_width / 2
     descripcion_y = y + card_height - 1.2 * cm
     dibujar_texto_con_saltos(c, descripcion_x, descripcion_y,
-                             producto.get("descripcion", ""),
-                             card_width - 1.2 * cm,
-                             get_font_name('bold'), 9, max_lineas=3)
-
-    try:
-        img = ImageReader(producto.get("imagen", ""))
-        c.drawImage(img, x + 0.5 * cm, y + 1.4 * cm, width=5.0 * cm, height=2.5 * cm,
-                    preserveAspectRatio=True, mask='auto')
-    except:
-        c.setFont(get_font_name('regular'), 7)
-        c.drawCentredString(x + card_width / 2, y + 2.5 * cm, "[Imagen no encontrada]")
-
-    draw_triangle(c, x + card_width, y, 1.4 * cm, triangle_color)
+                             producto.descripcion,
+                             DESC_WIDTH,
+                             get_font_name('bold'), DESC_FONT_SIZE, max_lineas=DESC_MAX_LINEAS,
+                             lineas=lineas_descripcion)
+
+    # leer_productos ya dejó vacía la imagen de los productos con fotos que faltan o están dañadas
+    if producto.imagen:
+        imagenes = imagenes or cache_por_defecto
+        try:
+            with etapa("imagenes"):
+                img = imagenes.obtener(producto.imagen)
+                c.drawImage(img, x + 0.5 * cm, y + 1.4 * cm, width=5.0 * cm, height=2.5 * cm,
+                            preserveAspectRatio=True, mask='auto')
+            contar("imagenes_dibujadas")
+            return
+        except (OSError, ValueError) as e:
+            # la revisión previa solo lee la cabecera: un JPEG cortado se descubre al decodificarlo
+            print(f"⚠️ {producto.codigo}: no se pudo dibujar {producto.imagen} ({e})")
+    c.setFont(get_font_name('regular'), 7)
+    c.drawCentredString(x + card_width / 2, y + 2.5 * cm, "[Imagen no encontrada]")
 
 # -------------------------------
 # GENERACIÓN DEL CATÁLOGO
 # -------------------------------
-def generar_catalogo(category_text, header_color):
-    cargar_fuentes()
-    logo_path = get_logo_path()
-    df = pd.read_excel(EXCEL_FILE)
-    c = canvas.Canvas(OUTPUT_FILE, pagesize=A4)
+def resolver_desde_indice(productos, indice=INDICE_RECORTES):
+    """
+    Para los productos cuya foto de la hoja no existe, usa el recorte de
+    ese código según el índice del extractor (leer_catalogo_viejo), sin
+    recorrer la carpeta. Si un código aparece en varias páginas vale el
+    último recorte, que es el que quedó escrito.
+    """
+    try:
+        with open(indice, encoding="utf-8") as f:
+            recortes = json.load(f)["recortes"]
+    except (OSError, ValueError, KeyError):
+        return productos
+    rutas = {r["code"]: r["path"] for r in recortes if r.get("code") and r.get("path")}
+    if not rutas:
+        return productos
+    resueltos = []
+    for p in productos:
+        if not (p.imagen and os.path.exists(p.imagen)) and p.codigo in rutas:
+            p = p._replace(imagen=rutas[p.codigo])
+        resueltos.append(p)
+    return resueltos
+
+
+def resolver_imagenes(productos, almacen=None):
+    """
+    Devuelve los productos con la foto que se va a dibujar: la de la hoja si
+    existe y si no la del almacén de imágenes para ese código. Los códigos
+    que comparten foto apuntan al mismo blob, que se incrusta una sola vez.
+    """
+    if almacen is None:
+        almacen = AlmacenImagenes()
+    if not len(almacen):
+        return productos
+    resueltos = []
+    for p in productos:
+        if not (p.imagen and os.path.exists(p.imagen)):
+            ruta = almacen.ruta(p.codigo)
+            if ruta:
+                p = p._replace(imagen=ruta)
+        resueltos.append(p)
+    return resueltos
+
+
+def leer_productos(excel_file=None, filtro=None, progreso=None, columna_categoria=None):
+    excel_file = excel_file or EXCEL_FILE
+    errores = []
+    productos = []
+    cargar = CACHE_HOJAS.cargar if CACHE_HOJAS is not None else cargar_productos
+    with etapa("carga"):
+        for producto in cargar(excel_file, IMAGES_DIR, errores, filtro, columna_categoria):
+            productos.append(producto)
+            if progreso and len(productos) % PROGRESO_FILAS == 0:
+                progreso.filas(len(productos))
+    if progreso:
+        progreso.filas(len(productos))
+    contar("filas", len(productos))
+    reportar_errores(errores, excel_file)
+    with etapa("indice_recortes"):
+        productos = resolver_desde_indice(productos)
+    if USAR_ALMACEN:
+        with etapa("almacen"):
+            productos = resolver_imagenes(productos)
+    # Revisión previa: las fotos que faltan o no se pueden leer se informan aquí,
+    # antes de dibujar, y esos productos quedan sin imagen
+    with etapa("revision_imagenes"):
+        return validar_imagenes(productos)
+
+
+@cronometrado("texto")
+def dividir_descripciones(productos):
+    """Divide en líneas todas las descripciones de una vez, antes de dibujar."""
+    return texto_motor.dividir_lote((p.descripcion for p in productos), DESC_WIDTH,
+                                    get_font_name('bold'), DESC_FONT_SIZE, DESC_MAX_LINEAS)
+
+
+def reportar_truncados(productos, envolturas):
+    truncados = [p.codigo for p, e in zip(productos, envolturas) if e.truncado]
+    if truncados:
+        print(f"⚠️ {len(truncados)} descripciones recortadas a {DESC_MAX_LINEAS} líneas: "
+              f"{', '.join(truncados[:20])}{' ...' if len(truncados) > 20 else ''}")
+
+
+def contar_imagenes(productos, pagina):
+    """Fotos que se dibujan en `pagina` (productos con imagen válida)."""
+    return sum(1 for p in productos[pagina.inicio:pagina.fin] if p.imagen)
+
+
+def renderizar_paginas(c, productos, paginas, category_text, header_color,
+                       logo_path, imagenes=None, plantillas=None, envolturas=None, progreso=None,
+                       al_cerrar_pagina=None, pagina_tamano=A4):
+    """
+    Dibuja en `c` las páginas del plan `paginas` (PaginaPlan de
+    maquetacion.planificar, con rangos sobre `productos`). No decide nada de
+    la disposición: cada página trae su número, sus tarjetas y si lleva pie.
+    `envolturas` son las descripciones ya divididas (dividir_descripciones);
+    si no se pasan se calculan aquí. Con `progreso` (progreso.Progreso) se
+    emite un evento por página y se puede cancelar entre páginas.
+    `al_cerrar_pagina(pagina)` se llama con cada página ya dibujada, antes
+    de showPage (p. ej. para agregar marcadores). `pagina_tamano` es el
+    tamaño del lienzo (Maqueta.pagina); encabezados y pie se ajustan a él.
+    """
     triangle_color = header_color
+    if envolturas is None:
+        envolturas = dividir_descripciones(productos)
+    if progreso:
+        progreso.iniciar_paginas(len(paginas))
+
+    for hechas, pagina in enumerate(paginas, start=1):
+        with etapa("encabezados"):
+            if pagina.numero == 0:
+                draw_header_page1(c, category_text, header_color, logo_path, pagina_tamano)
+            elif plantillas:
+                plantillas.header_pageN(category_text, header_color, logo_path, pagina_tamano)
+            else:
+                draw_header_pageN(c, category_text, header_color, logo_path, pagina_tamano)
+
+        for indice, (x, y) in zip(range(pagina.inicio, pagina.fin), pagina.ranuras):
+            if pagina.escala == 1:
+                draw_product_card(c, x, y, productos[indice], triangle_color, imagenes,
+                                  plantillas, envolturas[indice].lineas)
+            else:
+                c.saveState()
+                c.translate(x, y)
+                c.scale(pagina.escala, pagina.escala)
+                draw_product_card(c, 0, 0, productos[indice], triangle_color, imagenes,
+                                  plantillas, envolturas[indice].lineas)
+                c.restoreState()
+
+        if pagina.footer:
+            with etapa("encabezados"):
+                if plantillas:
+                    plantillas.footer(header_color, pagina_tamano)
+                else:
+                    draw_footer(c, header_color, pagina_tamano)
+        if al_cerrar_pagina:
+            al_cerrar_pagina(pagina)
+        c.showPage()
+        contar("paginas")
+        if progreso:
+            progreso.pagina(hechas, len(paginas), contar_imagenes(productos, pagina))
+
+
+def generar_catalogo(category_text, header_color, imagenes=None,
+                     output_file=None, usar_plantillas=True, workers=None, incremental=False,
+                     excel_file=None, filtro=None, maqueta=None, progreso=None, perfil=None):
+    """
+    Genera el catálogo en `output_file` (por defecto OUTPUT_FILE) a partir de
+    `excel_file` (por defecto EXCEL_FILE), opcionalmente solo con las filas
+    que cumplen `filtro` ({columna: valor}). Devuelve la ruta del PDF.
+    `maqueta` es el nombre de la rejilla (por defecto MAQUETA) y `perfil`
+    el perfil de salida ("print", "screen" o "mobile", ver perfiles_salida.py).
+    `progreso` (progreso.Progreso) recibe los eventos de avance; si se
+    cancela, se lanza progreso.Cancelado y no se escribe el PDF.
+    El dibujo se reparte en `workers` procesos (ver paralelo.py); por
+    defecto uno por núcleo, y en una máquina de un núcleo o con workers=1
+    se dibuja en este proceso (el único modo que usa `imagenes`). Sin pypdf
+    para unir las partes también se dibuja en este proceso.
+    Con incremental=True solo se redibujan las páginas que cambiaron desde
+    la última generación (ver incremental.py).
+    """
+    output_file = output_file or OUTPUT_FILE
+    maqueta = obtener_maqueta(maqueta or MAQUETA)
+    if incremental:
+        try:
+            import pypdf  # noqa: F401
+        except ImportError:
+            print("⚠️ pypdf no está instalado: se genera el catálogo completo")
+        else:
+            from incremental import generar_incremental
+            generar_incremental(category_text, header_color, output_file, imagenes, usar_plantillas,
+                                excel_file, filtro, maqueta, progreso, perfil)
+            return output_file
+    pedidos, workers = workers, workers or os.cpu_count() or 1
+    if workers > 1:
+        try:
+            import pypdf  # noqa: F401
+        except ImportError:
+            if pedidos:
+                print("⚠️ pypdf no está instalado: se dibuja en un solo proceso")
+        else:
+            from paralelo import generar_catalogo_paralelo
+            return generar_catalogo_paralelo(category_text, header_color, workers=workers,
+                                             output_file=output_file, usar_plantillas=usar_plantillas,
+                                             excel_file=excel_file, filtro=filtro, maqueta=maqueta,
+                                             progreso=progreso, perfil=perfil)
 
-    x_positions = [1.5 * cm, 8.0 * cm, 14.5 * cm]
-    row_step = 6.5 * cm
-    first_page_limit = 9
-    other_pages_limit = 12
-
-    header_height = draw_header_page1(c, category_text, header_color, logo_path)
-    y = PAGE_HEIGHT - header_height - 6 * cm
-    col, products_on_page, page_limit = 0, 0, first_page_limit
-
-    for _, row in df.iterrows():
-        imagen_nombre = str(row.get("imagen", "")).strip()
-        imagen_path = os.path.join("imagenes", imagen_nombre) if imagen_nombre else ""
-
-        producto = {
-            "codigo": str(row.get("codigo", "")),
-            "descripcion": str(row.get("descripcion", "")),
-            "imagen": imagen_path
-        }
-
-        draw_product_card(c, x_positions[col], y, producto, triangle_color)
-        col += 1
-        products_on_page += 1
-
-        if col == 3:
-            col = 0
-            y -= row_step
-
-        if products_on_page >= page_limit:
-            draw_footer(c, header_color)
-            c.showPage()
-            header_height = draw_header_pageN(c, category_text, header_color, logo_path)
-            y = PAGE_HEIGHT - header_height - PAGE2_START_Y_OFFSET
-            col, products_on_page, page_limit = 0, 0, other_pages_limit
-
-    c.save()
-    print(f"✅ Catálogo generado: {OUTPUT_FILE}")
+    cargar_fuentes()
+    imagenes = imagenes or cache_fotos(perfil)
+    logo_path = ruta_logo(perfil, get_logo_path())
+    productos = leer_productos(excel_file, filtro, progreso)
+    paginas = planificar(len(productos), maqueta)
+
+    with aplicar(perfil) as perfil:
+        envolturas = dividir_descripciones(productos)
+        reportar_truncados(productos, envolturas)
+
+        c = crear_lienzo(output_file, maqueta.pagina, perfil)
+        plantillas = Plantillas(c) if usar_plantillas else None
+        aciertos, fallos = imagenes.aciertos, imagenes.fallos
+        with etapa("dibujo"):
+            renderizar_paginas(c, productos, paginas, category_text, header_color,
+                               logo_path, imagenes, plantillas, envolturas, progreso,
+                               pagina_tamano=maqueta.pagina)
+        contar("cache_aciertos", imagenes.aciertos - aciertos)
+        contar("cache_fallos", imagenes.fallos - fallos)
+        with etapa("guardado"):
+            c.save()
+    contar("bytes_escritos", os.path.getsize(output_file))
+    if progreso:
+        progreso.fin(output_file)
+    print(f"✅ Catálogo generado: {output_file}")
+    return output_file
+
+
+def leer_color(valor):
+    """Convierte '#3AA8FF' o '3AA8FF' en un color de ReportLab (ValueError si no es HEX)."""
+    valor = (valor or "").strip()
+    if not re.match(r"^#?[0-9A-Fa-f]{6}$", valor):
+        raise ValueError(f"Formato HEX inválido: {valor!r}. Usa formato como #3AA8FF.")
+    if not valor.startswith("#"):
+        valor = "#" + valor
+    return colors.HexColor(valor)
 
 
 # -------------------------------
 # INTERFAZ DE USUARIO
 # -------------------------------
 def ui_main():
+    # tkinter se importa aquí para que el uso sin interfaz (cli.py) no lo cargue
+    import queue
+    import threading
+    from tkinter import Tk, Label, Entry, Button, colorchooser, messagebox
+    from tkinter import ttk
+    from progreso import Progreso, Cancelado, Evento, a_cola, describir
+    import servicio
+
     root = Tk()
     root.title("Generador de Catálogo")
-    root.geometry("420x300")
+    root.geometry("420x380")
 
     Label(root, text="Título del catálogo:", font=("Arial", 11)).pack(pady=8)
     title_entry = Entry(root, font=("Arial", 11))
@@ -186,25 +394,96 @@ def ui_main():
     color_entry.insert(0, "#63B7FF")
     color_entry.pack()
 
+    # La generación corre en un hilo aparte; sus eventos llegan por esta cola
+    # y se leen desde el hilo de Tk con after(), así la ventana no se congela
+    eventos = queue.Queue()
+    trabajo = {"progreso": None}
+
+    def generar_en_segundo_plano(title, final_color, progreso):
+        try:
+            # Si el servicio local está abierto (servicio.py) genera él, con todo ya en memoria
+            if servicio.disponible():
+                servicio.generar_remoto({"titulo": title, "color": "#" + final_color.hexval()[2:],
+                                         "entrada": os.path.abspath(EXCEL_FILE),
+                                         "salida": os.path.abspath(OUTPUT_FILE),
+                                         "incremental": True}, progreso)
+            else:
+                generar_catalogo(title, final_color, incremental=True, progreso=progreso)
+        except Cancelado:
+            eventos.put(("cancelado", None))
+        except Exception as e:
+            eventos.put(("error", e))
+        else:
+            eventos.put(("listo", None))
+
+    def revisar_eventos():
+        try:
+            while True:
+                item = eventos.get_nowait()
+                # Evento también es una tupla: lo que no es Evento es el (resultado, error) final
+                if not isinstance(item, Evento):
+                    terminar(*item)
+                    return
+                if item.etapa == "paginas" and item.total:
+                    barra.stop()
+                    barra.config(mode="determinate", maximum=item.total, value=item.hecho)
+                estado.config(text=describir(item))
+        except queue.Empty:
+            pass
+        root.after(100, revisar_eventos)
+
+    def terminar(resultado, error):
+        trabajo["progreso"] = None
+        barra.stop()
+        generar_btn.config(state="normal")
+        cancelar_btn.config(state="disabled")
+        if resultado == "listo":
+            messagebox.showinfo("Éxito", "Catálogo generado correctamente.")
+            root.destroy()
+        elif resultado == "cancelado":
+            estado.config(text="Generación cancelada")
+        else:
+            estado.config(text="")
+            messagebox.showerror("Error", f"No se pudo generar el catálogo:\n{error}")
+
     def start_generation():
         title = title_entry.get().strip() or "CATALOGO"
         manual_color = color_entry.get().strip()
         final_color = chosen_color["value"]
 
         if manual_color:
-            if not re.match(r"^#?[0-9A-Fa-f]{6}$", manual_color):
+            try:
+                final_color = leer_color(manual_color)
+            except ValueError:
                 messagebox.showerror("Error", "Formato HEX inválido. Usa formato como #3AA8FF.")
                 return
-            if not manual_color.startswith("#"):
-                manual_color = "#" + manual_color
-            final_color = colors.HexColor(manual_color)
-
-        generar_catalogo(title, final_color)
-        messagebox.showinfo("Éxito", "Catálogo generado correctamente.")
-        root.destroy()
 
-    Button(root, text="Generar Catálogo", command=start_generation,
-           font=("Arial", 12), bg="#4CAF50", fg="white", width=20).pack(pady=20)
+        progreso = Progreso(oyentes=[a_cola(eventos)])
+        trabajo["progreso"] = progreso
+        generar_btn.config(state="disabled")
+        cancelar_btn.config(state="normal")
+        barra.config(mode="indeterminate", value=0)
+        barra.start(10)
+        estado.config(text="Leyendo productos...")
+        threading.Thread(target=generar_en_segundo_plano, args=(title, final_color, progreso),
+                         daemon=True).start()
+        root.after(100, revisar_eventos)
+
+    def cancel_generation():
+        if trabajo["progreso"]:
+            trabajo["progreso"].cancelar()
+            estado.config(text="Cancelando...")
+
+    generar_btn = Button(root, text="Generar Catálogo", command=start_generation,
+                         font=("Arial", 12), bg="#4CAF50", fg="white", width=20)
+    generar_btn.pack(pady=(20, 8))
+
+    barra = ttk.Progressbar(root, length=340)
+    barra.pack()
+    estado = Label(root, text="", font=("Arial", 9))
+    estado.pack(pady=4)
+    cancelar_btn = Button(root, text="Cancelar", command=cancel_generation, state="disabled")
+    cancelar_btn.pack()
 
     root.mainloop()
 
@@ -0,0 +1,127 @@
+# =====================================
+# maquetacion.py
+# =====================================
+"""
+Maquetación del catálogo: dónde va cada tarjeta, calculado antes de dibujar.
+
+Una Maqueta describe la rejilla (columnas, filas en la primera página y en
+las demás, escala de la tarjeta y márgenes). planificar() convierte la
+cantidad de productos en un plan inmutable: una tupla de PaginaPlan, cada
+una con el rango de productos que lleva y la posición de cada tarjeta. El
+dibujo (main.renderizar_paginas) solo recorre ese plan, así que el plan se
+puede cachear, comparar o repartir entre procesos.
+
+Maquetas disponibles (MAQUETAS):
+    3x4   la original: 9 productos en la primera página y 12 en las demás
+    4x5   tarjetas al 74 %: 16 en la primera página y 20 en las demás
+"""
+from collections import namedtuple
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+
+from encabezados import FIRST_HEADER_HEIGHT, OTHER_HEADER_HEIGHT
+from footer import FOOTER_HEIGHT
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+TARJETA_ANCHO = 6.0 * cm   # tamaño de la tarjeta de draw_product_card a escala 1
+TARJETA_ALTO = 6.0 * cm
+# draw_header_page1 dibuja el fondo 1 cm más alto que FIRST_HEADER_HEIGHT
+ALTO_ENCABEZADO_PRIMERA = FIRST_HEADER_HEIGHT + 1 * cm
+ALTO_ENCABEZADO_OTRAS = OTHER_HEADER_HEIGHT
+
+Maqueta = namedtuple("Maqueta", [
+    "nombre", "pagina", "columnas", "filas_primera", "filas_otras", "escala",
+    "x_inicio", "separacion", "espacio_primera", "espacio_otras",
+])
+
+PaginaPlan = namedtuple("PaginaPlan", ["numero", "inicio", "fin", "ranuras", "escala", "footer"])
+PaginaPlan.__doc__ = """
+Una página del plan. numero 0 lleva el encabezado grande; [inicio, fin) son
+los productos que lleva; ranuras, la esquina inferior izquierda (x, y) de la
+tarjeta de cada uno; footer, si se dibuja el pie (solo en páginas llenas).
+"""
+
+
+# -------------------------------
+# MAQUETAS
+# -------------------------------
+def crear_maqueta(nombre, columnas, filas, pagina=A4, x_inicio=1.5 * cm, margen_derecho=0.5 * cm,
+                  separacion=0.5 * cm, espacio_otras=0.4 * cm, margen_inferior=0.5 * cm):
+    """
+    Maqueta de `columnas` x `filas` (filas en las páginas sin encabezado
+    grande) con la tarjeta escalada para que la rejilla quepa entre los
+    márgenes, el encabezado y el pie. Las filas de la primera página son
+    las que entran bajo el encabezado grande. `pagina` (ancho, alto) puede
+    ser cualquier tamaño: encabezados y pie se dibujan para él
+    (main.renderizar_paginas recibe Maqueta.pagina).
+    """
+    ancho, alto = pagina
+    piso = FOOTER_HEIGHT + margen_inferior
+    escala = min(
+        (ancho - x_inicio - margen_derecho) / (columnas * TARJETA_ANCHO + (columnas - 1) * separacion),
+        (alto - ALTO_ENCABEZADO_OTRAS - espacio_otras - piso)
+        / (filas * TARJETA_ALTO + (filas - 1) * separacion),
+    )
+    paso = (TARJETA_ALTO + separacion) * escala
+    filas_primera = int((alto - ALTO_ENCABEZADO_PRIMERA - piso + separacion * escala) // paso)
+    return Maqueta(nombre, pagina, columnas, max(1, filas_primera), filas, escala,
+                   x_inicio, separacion, 0.0, espacio_otras)
+
+
+MAQUETAS = {
+    # Valores exactos de la rejilla original (X_POSITIONS 1.5/8/14.5 cm, ROW_STEP 6.5 cm)
+    "3x4": Maqueta("3x4", A4, 3, 3, 4, 1.0, 1.5 * cm, 0.5 * cm, 0.0, 0.4 * cm),
+    "4x5": crear_maqueta("4x5", 4, 5),
+}
+MAQUETA_POR_DEFECTO = "3x4"
+
+
+def obtener_maqueta(maqueta=None):
+    """Acepta una Maqueta, su nombre en MAQUETAS o None (la maqueta por defecto)."""
+    if isinstance(maqueta, Maqueta):
+        return maqueta
+    nombre = maqueta or MAQUETA_POR_DEFECTO
+    if nombre not in MAQUETAS:
+        raise ValueError(f"Maqueta desconocida: {nombre} (usa {', '.join(sorted(MAQUETAS))})")
+    return MAQUETAS[nombre]
+
+
+# -------------------------------
+# PLAN
+# -------------------------------
+def _ranuras(maqueta, filas, alto_encabezado, espacio):
+    paso_x = (TARJETA_ANCHO + maqueta.separacion) * maqueta.escala
+    paso_y = (TARJETA_ALTO + maqueta.separacion) * maqueta.escala
+    y = maqueta.pagina[1] - alto_encabezado - espacio - TARJETA_ALTO * maqueta.escala
+    return tuple((maqueta.x_inicio + col * paso_x, y - fila * paso_y)
+                 for fila in range(filas) for col in range(maqueta.columnas))
+
+
+def planificar(total, maqueta=None):
+    """
+    Devuelve el plan de páginas (tupla de PaginaPlan) para `total` productos.
+    Como en el dibujo original, si la última página se llena se abre una
+    página más que solo lleva el encabezado.
+    """
+    maqueta = obtener_maqueta(maqueta)
+    primera = _ranuras(maqueta, maqueta.filas_primera, ALTO_ENCABEZADO_PRIMERA, maqueta.espacio_primera)
+    otras = _ranuras(maqueta, maqueta.filas_otras, ALTO_ENCABEZADO_OTRAS, maqueta.espacio_otras)
+
+    paginas = []
+    inicio, ranuras = 0, primera
+    while True:
+        fin = min(inicio + len(ranuras), total)
+        llena = fin - inicio >= len(ranuras)
+        paginas.append(PaginaPlan(len(paginas), inicio, fin,
+                                  ranuras if llena else ranuras[:fin - inicio],
+                                  maqueta.escala, llena))
+        if not llena:
+            return tuple(paginas)
+        inicio, ranuras = fin, otras
+
+
+def desplazar(paginas, desde):
+    """Las mismas páginas con los rangos de productos relativos a `desde`."""
+    return tuple(p._replace(inicio=p.inicio - desde, fin=p.fin - desde) for p in paginas)
@@ -0,0 +1,198 @@
+# =====================================
+# paralelo.py
+# =====================================
+"""
+Generación del catálogo repartida en varios procesos.
+
+El plan de páginas (maquetacion.planificar) se calcula antes de dibujar y
+se reparte en tramos contiguos. Cada proceso dibuja su tramo en un PDF
+parcial con las mismas funciones que el modo en serie, y al final los
+parciales se unen en el PDF de salida.
+
+Requisitos adicionales:
+    pip install pypdf
+"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import main
+from fuentes import cargar_fuentes
+from encabezados import get_logo_path
+from plantillas import Plantillas
+from maquetacion import desplazar, obtener_maqueta, planificar
+from perfiles_salida import aplicar, cache_fotos, crear_lienzo, ruta_logo
+from instrumentacion import contar, cronometrado, etapa
+from archivos import escritura_atomica
+
+
+# -------------------------------
+# REPARTO DE PÁGINAS
+# -------------------------------
+def repartir_paginas(paginas, partes):
+    """Divide la lista de páginas en `partes` tramos contiguos de tamaño parecido."""
+    partes = max(1, min(partes, len(paginas)))
+    base, resto = divmod(len(paginas), partes)
+    tramos, inicio = [], 0
+    for i in range(partes):
+        fin = inicio + base + (1 if i < resto else 0)
+        tramos.append((inicio, fin))
+        inicio = fin
+    return tramos
+
+
+def _renderizar_tramo(category_text, header_color, productos, paginas, pagesize,
+                      salida, usar_plantillas, perfil):
+    """Trabajo de cada proceso: dibuja sus páginas en el PDF parcial `salida`."""
+    cargar_fuentes()
+    logo_path = ruta_logo(perfil, get_logo_path())
+    with aplicar(perfil) as perfil:
+        c = crear_lienzo(salida, pagesize, perfil)
+        plantillas = Plantillas(c) if usar_plantillas else None
+        main.renderizar_paginas(c, productos, paginas, category_text, header_color,
+                                logo_path, cache_fotos(perfil), plantillas, pagina_tamano=pagesize)
+        c.save()
+    return salida
+
+
+# -------------------------------
+# UNIÓN DE PDFs
+# -------------------------------
+def _deduplicar(writer):
+    """
+    Devuelve un PdfWriter con las páginas de `writer` donde los objetos
+    repetidos entre parciales (logo, íconos, fotos, forms de plantillas,
+    fuentes) quedan una sola vez.
+
+    Cada objeto se identifica por sus bytes tal como se escriben (flujos sin
+    decodificar) después de reemplazar sus referencias por las ya
+    identificadas, de abajo hacia arriba: SMask, imagen, form que la usa.
+    Las copias que quedan sin referencias no pasan al PdfWriter nuevo, porque
+    add_page() solo copia lo que alcanzan las páginas.
+    """
+    from pypdf import PdfWriter
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+    canonicos, por_contenido = {}, {}
+
+    def canonico(valor):
+        if isinstance(valor, IndirectObject):
+            if valor.idnum not in canonicos:
+                canonicos[valor.idnum] = valor   # evita ciclos mientras se recorre
+                obj = valor.get_object()
+                if obj is not None:
+                    canonico(obj)
+                    datos = io.BytesIO()
+                    obj.write_to_stream(datos)
+                    clave = hashlib.sha1(datos.getvalue()).digest()
+                    canonicos[valor.idnum] = por_contenido.setdefault(clave, valor)
+            return canonicos[valor.idnum]
+        if isinstance(valor, DictionaryObject):
+            for clave in list(valor.keys()):
+                if clave != "/Parent":
+                    actual = valor.raw_get(clave)
+                    nuevo = canonico(actual)
+                    if nuevo is not actual:
+                        valor[clave] = nuevo
+        elif isinstance(valor, ArrayObject):
+            for i, actual in enumerate(valor):
+                nuevo = canonico(actual)
+                if nuevo is not actual:
+                    valor[i] = nuevo
+        return valor
+
+    for pagina in writer.pages:
+        if "/Resources" in pagina:
+            canonico(pagina["/Resources"])
+    limpio = PdfWriter()
+    for pagina in writer.pages:
+        limpio.add_page(pagina)
+    return limpio
+
+
+@cronometrado("union")
+def unir_pdfs(partes, salida):
+    """Concatena los PDFs `partes` en `salida` (en ese orden)."""
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise RuntimeError("Para unir los PDFs parciales instala pypdf: pip install pypdf")
+
+    if len(partes) == 1:
+        shutil.copyfile(partes[0], salida)
+        return salida
+
+    writer = PdfWriter()
+    for parte in partes:
+        writer.append(parte)
+    # Cada parcial trae su copia del logo, el ícono, las fotos repetidas, los
+    # forms de plantillas y las fuentes: se deja una de cada
+    writer = _deduplicar(writer)
+    with escritura_atomica(salida) as temporal:
+        with open(temporal, "wb") as f:
+            writer.write(f)
+    return salida
+
+
+# -------------------------------
+# GENERACIÓN EN PARALELO
+# -------------------------------
+def generar_catalogo_paralelo(category_text, header_color, workers=None,
+                              output_file=None, usar_plantillas=True, excel_file=None, filtro=None,
+                              maqueta=None, progreso=None, perfil=None):
+    """
+    Igual que main.generar_catalogo pero repartiendo las páginas entre
+    `workers` procesos (por defecto, uno por núcleo). Con `progreso` se
+    emite un evento cada vez que termina un tramo; al cancelar se descartan
+    los tramos que aún no empezaron.
+    """
+    output_file = output_file or main.OUTPUT_FILE
+    workers = workers or os.cpu_count() or 1
+    maqueta = obtener_maqueta(maqueta or main.MAQUETA)
+
+    cargar_fuentes()
+    productos = main.leer_productos(excel_file, filtro, progreso)
+    paginas = planificar(len(productos), maqueta)
+    with aplicar(perfil):
+        main.reportar_truncados(productos, main.dividir_descripciones(productos))
+    tramos = repartir_paginas(paginas, workers)
+
+    with tempfile.TemporaryDirectory(prefix="catalogo_") as tmp:
+        # En los procesos no hay medición activa: aquí solo se ve el tiempo total de dibujo
+        with etapa("dibujo"), ProcessPoolExecutor(max_workers=len(tramos)) as pool:
+            futuros = []
+            if progreso:
+                progreso.iniciar_paginas(len(paginas))
+            for n, (a, b) in enumerate(tramos):
+                paginas_tramo = paginas[a:b]
+                desde, hasta = paginas_tramo[0].inicio, paginas_tramo[-1].fin
+                # Rangos relativos al trozo de productos que recibe el proceso
+                relativas = desplazar(paginas_tramo, desde)
+                salida = os.path.join(tmp, f"parte_{n:04d}.pdf")
+                futuros.append(pool.submit(_renderizar_tramo, category_text, header_color,
+                                           productos[desde:hasta], relativas, maqueta.pagina,
+                                           salida, usar_plantillas, perfil))
+            hechas = 0
+            try:
+                for futuro in as_completed(futuros):
+                    futuro.result()
+                    if progreso:
+                        a, b = tramos[futuros.index(futuro)]
+                        hechas += b - a
+                        progreso.pagina(hechas, len(paginas),
+                                        sum(main.contar_imagenes(productos, p) for p in paginas[a:b]))
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+            partes = [f.result() for f in futuros]
+
+        unir_pdfs(partes, output_file)
+    contar("bytes_escritos", os.path.getsize(output_file))
+
+    if progreso:
+        progreso.fin(output_file)
+    print(f"✅ Catálogo generado: {output_file} ({len(paginas)} páginas, {len(tramos)} procesos)")
+    return output_file
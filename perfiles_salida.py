@@ -0,0 +1,239 @@
+# =====================================
+# perfiles_salida.py
+# =====================================
+"""
+Perfiles de salida del PDF: cuánto pesa el catálogo según dónde se va a usar.
+
+    print    para imprenta: fotos a 200 DPI (JPEG 85), logo original y
+             fuentes TTF incrustadas (subconjuntos). Es la salida de siempre.
+    screen   para ver en pantalla o mandar por correo: fotos a 150 DPI
+             (JPEG 75), logo a 200 DPI y flujos sin codificar en ASCII85
+    mobile   para WhatsApp: fotos a 100 DPI (JPEG 60), logo a 150 DPI, sin
+             ASCII85 y con las fuentes estándar de PDF (no se incrustan)
+
+ReportLab codifica por defecto las imágenes y el contenido comprimido
+también en ASCII85, que agrega un 25 % a esos flujos; screen y mobile lo
+desactivan (rl_config.useA85, global del proceso mientras dura aplicar()).
+Como es global, las generaciones simultáneas de un mismo proceso (hilos del
+servicio o de cli.py --concurrentes) comparten el valor: aplicar() deja
+pasar juntas a las que usan el mismo y hace esperar a las demás.
+
+reporte_bytes() reparte el tamaño de un PDF en imágenes, fuentes, contenido
+vectorial (páginas y forms) y el resto (diccionarios, xref, marcadores):
+    python perfiles_salida.py catalogo.pdf
+"""
+import os
+import sys
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from reportlab import rl_config
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+
+from cache_imagenes import CacheImagenes, cache_por_defecto, THUMB_DPI, THUMB_JPEG_QUALITY
+from fuentes import solo_estandar
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+# Caja del logo más grande (bloque negro del encabezado de la primera página)
+LOGO_ANCHO = 6.0 * cm
+LOGO_ALTO = 5.0 * cm
+
+PerfilSalida = namedtuple("PerfilSalida", [
+    "nombre", "compresion", "a85", "dpi_fotos", "calidad_fotos",
+    "dpi_logos", "calidad_logos", "fuentes_incrustadas",
+])
+PerfilSalida.__doc__ = """
+compresion: pageCompression del canvas (Flate en el contenido de las páginas).
+a85: codificar además los flujos en ASCII85. dpi_logos None deja el logo
+como está. Con fuentes_incrustadas=False se usan las fuentes estándar.
+"""
+
+PERFILES = {
+    "print": PerfilSalida("print", 1, 1, THUMB_DPI, THUMB_JPEG_QUALITY, None, None, True),
+    "screen": PerfilSalida("screen", 1, 0, 150, 75, 200, 85, True),
+    "mobile": PerfilSalida("mobile", 1, 0, 100, 60, 150, 75, False),
+}
+PERFIL_POR_DEFECTO = "print"
+
+_caches = {}
+_lock = threading.Lock()
+
+# rl_config.useA85 mientras haya generaciones dentro de aplicar()
+_a85 = threading.Condition()
+_a85_estado = {"valor": None, "activos": 0, "anterior": None}
+_a85_hilo = threading.local()
+
+
+def obtener_perfil(perfil=None):
+    """Acepta un PerfilSalida, su nombre en PERFILES o None (el perfil por defecto)."""
+    if isinstance(perfil, PerfilSalida):
+        return perfil
+    nombre = perfil or PERFIL_POR_DEFECTO
+    if nombre not in PERFILES:
+        raise ValueError(f"Perfil de salida desconocido: {nombre} (usa {', '.join(sorted(PERFILES))})")
+    return PERFILES[nombre]
+
+
+# -------------------------------
+# APLICACIÓN
+# -------------------------------
+def _cache(dpi, calidad):
+    if (dpi, calidad) == (THUMB_DPI, THUMB_JPEG_QUALITY):
+        return cache_por_defecto
+    with _lock:
+        if (dpi, calidad) not in _caches:
+            _caches[dpi, calidad] = CacheImagenes(dpi=dpi, calidad=calidad)
+        return _caches[dpi, calidad]
+
+
+def cache_fotos(perfil):
+    """Caché de miniaturas de las fotos de producto a la resolución del perfil."""
+    perfil = obtener_perfil(perfil)
+    return _cache(perfil.dpi_fotos, perfil.calidad_fotos)
+
+
+def ruta_logo(perfil, logo_path):
+    """El logo reducido a la resolución del perfil (o tal cual si no la fija)."""
+    perfil = obtener_perfil(perfil)
+    if not logo_path or perfil.dpi_logos is None or not os.path.exists(logo_path):
+        return logo_path
+    return _cache(perfil.dpi_logos, perfil.calidad_logos).obtener(logo_path, LOGO_ANCHO, LOGO_ALTO)
+
+
+def limpiar_caches():
+    """Vacía el LRU en memoria de las cachés de los perfiles (p. ej. después de borrar CACHE_DIR)."""
+    cache_por_defecto.limpiar()
+    with _lock:
+        for cache in _caches.values():
+            cache.limpiar()
+
+
+def crear_lienzo(salida, pagesize, perfil=None):
+    return canvas.Canvas(salida, pagesize=pagesize, pageCompression=obtener_perfil(perfil).compresion)
+
+
+@contextmanager
+def _usar_a85(valor):
+    """
+    Fija rl_config.useA85 = `valor` mientras dura el bloque. Varios hilos
+    pueden estar dentro a la vez si piden el mismo valor; uno que pide el
+    otro espera a que salgan todos. El último en salir restaura el original.
+    """
+    propios = getattr(_a85_hilo, "activos", 0)
+    with _a85:
+        if propios and _a85_estado["valor"] != valor:
+            raise RuntimeError("aplicar() anidado con otro valor de ASCII85 en el mismo hilo")
+        while _a85_estado["activos"] and _a85_estado["valor"] != valor:
+            _a85.wait()
+        if not _a85_estado["activos"]:
+            _a85_estado["anterior"] = rl_config.useA85
+            _a85_estado["valor"] = valor
+            rl_config.useA85 = valor
+        _a85_estado["activos"] += 1
+    _a85_hilo.activos = propios + 1
+    try:
+        yield
+    finally:
+        _a85_hilo.activos = propios
+        with _a85:
+            _a85_estado["activos"] -= 1
+            if not _a85_estado["activos"]:
+                rl_config.useA85 = _a85_estado["anterior"]
+                _a85.notify_all()
+
+
+@contextmanager
+def aplicar(perfil=None):
+    """
+    Ajustes del perfil que ReportLab lee al dibujar: ASCII85 y fuentes. Todo
+    el dibujo y el guardado del PDF deben ir dentro del bloque. Si otro hilo
+    está generando con el otro valor de ASCII85, espera a que termine.
+    """
+    perfil = obtener_perfil(perfil)
+    with _usar_a85(perfil.a85), solo_estandar(not perfil.fuentes_incrustadas):
+        yield perfil
+
+
+# -------------------------------
+# REPORTE DE BYTES
+# -------------------------------
+def _largo(flujo):
+    # pypdf deja en _data los bytes del flujo tal como están en el archivo
+    datos = getattr(flujo, "_data", None)
+    return len(datos) if datos is not None else 0
+
+
+def reporte_bytes(ruta):
+    """
+    Devuelve {"total", "imagenes", "fuentes", "vectorial", "otros"} en bytes
+    (largo de los flujos ya comprimidos; "otros" es el resto del archivo).
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("Para el reporte de bytes instala pypdf: pip install pypdf")
+
+    reporte = {"total": os.path.getsize(ruta), "imagenes": 0, "fuentes": 0, "vectorial": 0}
+    vistos = set()
+
+    def sumar(categoria, ref):
+        clave = getattr(ref, "idnum", None) or id(ref)
+        if clave in vistos:
+            return None
+        vistos.add(clave)
+        obj = ref.get_object()
+        reporte[categoria] += _largo(obj)
+        return obj
+
+    def diccionario(res, clave):
+        valor = res.get(clave)
+        return valor.get_object() if valor is not None else {}
+
+    def recursos(res):
+        if not res:
+            return
+        res = res.get_object()
+        for ref in diccionario(res, "/XObject").values():
+            obj = ref.get_object()
+            if obj.get("/Subtype") == "/Image":
+                if sumar("imagenes", ref) is not None and "/SMask" in obj:
+                    sumar("imagenes", obj.raw_get("/SMask"))
+            elif obj.get("/Subtype") == "/Form" and sumar("vectorial", ref) is not None:
+                recursos(obj.get("/Resources"))
+        for ref in diccionario(res, "/Font").values():
+            fuente = ref.get_object()
+            for f in [fuente] + [d.get_object() for d in fuente.get("/DescendantFonts", [])]:
+                if "/ToUnicode" in f:
+                    sumar("fuentes", f.raw_get("/ToUnicode"))
+                descriptor = diccionario(f, "/FontDescriptor")
+                for clave in ("/FontFile", "/FontFile2", "/FontFile3"):
+                    if clave in descriptor:
+                        sumar("fuentes", descriptor.raw_get(clave))
+
+    for pagina in PdfReader(ruta).pages:
+        contenido = pagina.raw_get("/Contents") if "/Contents" in pagina else None
+        if contenido is not None:
+            lista = contenido.get_object()
+            for ref in lista if isinstance(lista, list) else [contenido]:
+                sumar("vectorial", ref)
+        recursos(pagina.get("/Resources"))
+
+    reporte["otros"] = reporte["total"] - reporte["imagenes"] - reporte["fuentes"] - reporte["vectorial"]
+    return reporte
+
+
+def imprimir_reporte(reporte, salida=None):
+    total = reporte["total"] or 1
+    print(f"   {'categoría':<12}{'KB':>10}{'%':>8}", file=salida)
+    for categoria in ("imagenes", "fuentes", "vectorial", "otros", "total"):
+        n = reporte[categoria]
+        print(f"   {categoria:<12}{n / 1024:>10.1f}{100 * n / total:>8.1f}", file=salida)
+
+
+if __name__ == "__main__":
+    for ruta in sys.argv[1:] or ["catalogo.pdf"]:
+        print(f"📄 {ruta}")
+        imprimir_reporte(reporte_bytes(ruta))
@@ -0,0 +1,108 @@
+# =====================================
+# plantillas.py
+# =====================================
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from footer import draw_footer
+from encabezados import draw_header_pageN, OTHER_HEADER_HEIGHT
+
+# Margen alrededor de la tarjeta para el bbox del form (el fondo del código
+# sobresale 0.05 cm a la izquierda y el triángulo no pasa del borde derecho).
+CARD_BBOX_MARGIN = 0.5 * cm
+
+
+# -------------------------------
+# PLANTILLAS (FORM XOBJECTS)
+# -------------------------------
+def _nombre_form(prefijo, *partes):
+    firma = "|".join(str(p) for p in partes)
+    return f"{prefijo}_{hashlib.md5(firma.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _color_key(color):
+    return color.hexval() if hasattr(color, "hexval") else str(color)
+
+
+class Plantillas:
+    """
+    Define una sola vez por documento (como form XObject de PDF) los elementos
+    que se repiten en cada página: encabezado de páginas siguientes, footer y
+    marco de las tarjetas. Después se colocan por referencia con doForm, así
+    que el trazado vectorial y las imágenes del logo e Instagram se escriben
+    una vez en el PDF.
+    """
+
+    def __init__(self, c):
+        self.c = c
+        self._definidas = set()
+
+    def _usar(self, nombre, dibujar, bbox=(0, 0, None, None)):
+        if nombre not in self._definidas:
+            self.c.beginForm(nombre, *bbox)
+            dibujar()
+            self.c.endForm()
+            self._definidas.add(nombre)
+        self.c.doForm(nombre)
+
+    def header_pageN(self, category_text, header_color, logo_path, pagina=A4):
+        nombre = _nombre_form("HdrN", category_text, _color_key(header_color), logo_path, *pagina)
+        self._usar(nombre, lambda: draw_header_pageN(self.c, category_text, header_color, logo_path, pagina),
+                   (0, 0) + tuple(pagina))
+        return OTHER_HEADER_HEIGHT
+
+    def footer(self, header_color, pagina=A4):
+        nombre = _nombre_form("Footer", _color_key(header_color), *pagina)
+        self._usar(nombre, lambda: draw_footer(self.c, header_color, pagina), (0, 0) + tuple(pagina))
+
+    def card_chrome(self, x, y, triangle_color, dibujar, card_width, card_height):
+        """Coloca en (x, y) el marco de tarjeta dibujado por dibujar(c, 0, 0, color)."""
+        nombre = _nombre_form("Card", _color_key(triangle_color), card_width, card_height)
+        m = CARD_BBOX_MARGIN
+        bbox = (-m, -m, card_width + m, card_height + m)
+        self.c.saveState()
+        self.c.translate(x, y)
+        self._usar(nombre, lambda: dibujar(self.c, 0, 0, triangle_color), bbox)
+        self.c.restoreState()
+
+
+# -------------------------------
+# COMPARACIÓN (tamaño y tiempo)
+# -------------------------------
+def comparar(category_text="BOLSAS", color_hex="#63B7FF", repeticiones=3):
+    """
+    Genera el catálogo con y sin plantillas y muestra el tamaño del PDF y el
+    mejor tiempo de cada modo.
+    """
+    from reportlab.lib import colors
+    import main
+
+    color = colors.HexColor(color_hex)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for modo, usar in (("directo", False), ("plantillas", True)):
+            salida = os.path.join(tmp, f"catalogo_{modo}.pdf")
+            tiempos = []
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                main.generar_catalogo(category_text, color, output_file=salida, usar_plantillas=usar,
+                                      workers=1)
+                tiempos.append(time.perf_counter() - t0)
+            resultados[modo] = (os.path.getsize(salida), min(tiempos))
+
+    print(f"\n{'modo':<12}{'tamaño (KB)':>14}{'tiempo (s)':>14}")
+    for modo, (size, t) in resultados.items():
+        print(f"{modo:<12}{size / 1024:>14.1f}{t:>14.3f}")
+    base_size, base_t = resultados["directo"]
+    size, t = resultados["plantillas"]
+    print(f"\nPlantillas: {100 * (1 - size / base_size):.1f}% menos bytes, "
+          f"{100 * (1 - t / base_t):.1f}% menos tiempo")
+    return resultados
+
+
+if __name__ == "__main__":
+    comparar(*sys.argv[1:3])
@@ -0,0 +1,196 @@
+# =====================================
+# productos.py
+# =====================================
+"""
+Lectura de la hoja de productos fila por fila, sin pandas.
+
+Formatos aceptados según la extensión:
+    .xlsx / .xlsm   openpyxl en modo read_only (streaming)
+    .csv            módulo csv (UTF-8, separador detectado)
+    .parquet        pyarrow por lotes (pip install pyarrow)
+"""
+import csv
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+COLUMNAS_REQUERIDAS = ("codigo", "descripcion", "imagen")
+PARQUET_BATCH_SIZE = 4096
+HOJAS_MAX_ENTRADAS = 16    # hojas leídas que guarda CacheHojas
+
+Producto = namedtuple("Producto", ["codigo", "descripcion", "imagen", "categoria"], defaults=("",))
+
+
+# -------------------------------
+# LECTORES (filas como tuplas, la primera es el encabezado)
+# -------------------------------
+def _filas_excel(ruta):
+    from openpyxl import load_workbook
+    wb = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        for fila in ws.iter_rows(values_only=True):
+            yield fila
+    finally:
+        wb.close()
+
+
+def _filas_csv(ruta):
+    with open(ruta, newline="", encoding="utf-8-sig") as f:
+        muestra = f.read(4096)
+        f.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+        except csv.Error:
+            dialecto = csv.excel
+        for fila in csv.reader(f, dialecto):
+            yield fila
+
+
+def _filas_parquet(ruta):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Para leer archivos Parquet instala pyarrow: pip install pyarrow")
+    archivo = pq.ParquetFile(ruta)
+    columnas = archivo.schema_arrow.names
+    yield tuple(columnas)
+    for lote in archivo.iter_batches(batch_size=PARQUET_BATCH_SIZE):
+        datos = lote.to_pydict()
+        valores = [datos[col] for col in columnas]
+        yield from zip(*valores)
+
+
+LECTORES = {
+    ".xlsx": _filas_excel,
+    ".xlsm": _filas_excel,
+    ".csv": _filas_csv,
+    ".parquet": _filas_parquet,
+    ".pq": _filas_parquet,
+}
+
+
+# -------------------------------
+# CARGA Y VALIDACIÓN
+# -------------------------------
+def _texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, float):
+        if valor != valor:  # NaN
+            return ""
+        if valor.is_integer():
+            return str(int(valor))
+    return str(valor).strip()
+
+
+def cargar_productos(ruta, carpeta_imagenes="imagenes", errores=None, filtro=None,
+                     columna_categoria=None):
+    """
+    Genera un Producto por cada fila válida de `ruta`. Con `filtro`
+    ({columna: valor}) solo se devuelven las filas cuyas columnas coinciden
+    (sin distinguir mayúsculas). Con `columna_categoria`, el valor de esa
+    columna queda en Producto.categoria.
+
+    Lanza ValueError si faltan columnas requeridas. Las filas sin código se
+    omiten y se agregan a `errores` (lista de (número de fila, motivo)) para
+    informarlas todas juntas al terminar; las filas vacías se ignoran.
+    """
+    ext = os.path.splitext(ruta)[1].lower()
+    if ext not in LECTORES:
+        raise ValueError(f"Formato no soportado: {ruta} (usa {', '.join(sorted(LECTORES))})")
+
+    filas = LECTORES[ext](ruta)
+    encabezado = next(filas, None)
+    if encabezado is None:
+        raise ValueError(f"La hoja {ruta} está vacía")
+
+    nombres = [_texto(n).lower() for n in encabezado]
+    faltantes = [col for col in COLUMNAS_REQUERIDAS if col not in nombres]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en {ruta}: {', '.join(faltantes)}")
+    i_codigo, i_descripcion, i_imagen = (nombres.index(col) for col in COLUMNAS_REQUERIDAS)
+
+    condiciones = []
+    for col, valor in (filtro or {}).items():
+        if col.lower() not in nombres:
+            raise ValueError(f"La columna del filtro no existe en {ruta}: {col}")
+        condiciones.append((nombres.index(col.lower()), _texto(valor).lower()))
+    i_categoria = None
+    if columna_categoria:
+        if columna_categoria.lower() not in nombres:
+            raise ValueError(f"La columna de categoría no existe en {ruta}: {columna_categoria}")
+        i_categoria = nombres.index(columna_categoria.lower())
+    ancho = max([i_codigo, i_descripcion, i_imagen, i_categoria or 0]
+                + [i for i, _ in condiciones]) + 1
+
+    for numero, fila in enumerate(filas, start=2):
+        if len(fila) < ancho:
+            fila = tuple(fila) + (None,) * (ancho - len(fila))
+        if any(_texto(fila[i]).lower() != valor for i, valor in condiciones):
+            continue
+        codigo = _texto(fila[i_codigo])
+        descripcion = _texto(fila[i_descripcion])
+        imagen = _texto(fila[i_imagen])
+
+        if not codigo:
+            if (descripcion or imagen) and errores is not None:
+                errores.append((numero, "falta el código"))
+            continue
+
+        yield Producto(codigo, descripcion,
+                       os.path.join(carpeta_imagenes, imagen) if imagen else "",
+                       _texto(fila[i_categoria]) if i_categoria is not None else "")
+
+
+class CacheHojas:
+    """
+    Hojas ya leídas en memoria, para un proceso que genera muchos catálogos
+    (servicio.py). La clave incluye la fecha y el tamaño del archivo, así que
+    una hoja modificada se vuelve a leer. cargar() tiene los mismos
+    argumentos que cargar_productos y devuelve la lista completa.
+    """
+
+    def __init__(self, max_entradas=HOJAS_MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self._hojas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def cargar(self, ruta, carpeta_imagenes="imagenes", errores=None, filtro=None,
+               columna_categoria=None):
+        st = os.stat(ruta)
+        clave = (os.path.abspath(ruta), st.st_mtime_ns, st.st_size, carpeta_imagenes,
+                 tuple(sorted((filtro or {}).items())), columna_categoria)
+        with self._lock:
+            guardada = self._hojas.get(clave)
+            if guardada is not None:
+                self._hojas.move_to_end(clave)
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+        if guardada is None:
+            propios = []
+            guardada = (list(cargar_productos(ruta, carpeta_imagenes, propios, filtro,
+                                              columna_categoria)), propios)
+            with self._lock:
+                self._hojas[clave] = guardada
+                if len(self._hojas) > self.max_entradas:
+                    self._hojas.popitem(last=False)
+        productos, rechazadas = guardada
+        if errores is not None:
+            errores.extend(rechazadas)
+        return list(productos)
+
+
+def reportar_errores(errores, ruta=""):
+    """Imprime de una vez todas las filas rechazadas por cargar_productos."""
+    if not errores:
+        return
+    print(f"⚠️ {len(errores)} filas con errores en {ruta or 'la hoja de productos'}:")
+    for numero, motivo in errores:
+        print(f"   fila {numero}: {motivo}")
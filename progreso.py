@@ -0,0 +1,132 @@
+# =====================================
+# progreso.py
+# =====================================
+"""
+Eventos de progreso de una generación y cancelación.
+
+generar_catalogo(..., progreso=Progreso()) emite un Evento por etapa:
+    filas     filas leídas de la hoja (hecho = filas)
+    paginas   páginas terminadas (hecho/total), fotos dibujadas hasta ahora
+              y segundos estimados que faltan (restante)
+    fin       el PDF está escrito (mensaje = ruta)
+
+Los oyentes son funciones que reciben el Evento y se llaman desde el hilo
+que genera. La interfaz Tk usa a_cola() y lee la cola con after(); la línea
+de comandos usa a_consola() y a_log() sirve para logging. Progreso.cancelar()
+hace que la generación se detenga en la página siguiente con Cancelado, sin
+escribir el PDF.
+"""
+import sys
+import threading
+import time
+from collections import namedtuple
+
+Evento = namedtuple("Evento", ["nombre", "etapa", "hecho", "total", "imagenes", "restante", "mensaje"])
+
+
+class Cancelado(Exception):
+    """La generación se detuvo porque se pidió cancelarla."""
+
+
+class Progreso:
+    def __init__(self, nombre="", oyentes=()):
+        self.nombre = nombre
+        self._oyentes = list(oyentes)
+        self._cancelado = threading.Event()
+        self._inicio_paginas = None
+        self.imagenes = 0
+
+    def registrar(self, oyente):
+        self._oyentes.append(oyente)
+        return self
+
+    # --- cancelación ---
+    def cancelar(self):
+        self._cancelado.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def verificar(self):
+        """Lanza Cancelado si se pidió cancelar."""
+        if self._cancelado.is_set():
+            raise Cancelado(self.nombre or "generación cancelada")
+
+    # --- eventos ---
+    def emitir(self, etapa, hecho=0, total=0, mensaje=""):
+        restante = None
+        if etapa == "paginas":
+            ahora = time.perf_counter()
+            if self._inicio_paginas is None or hecho == 0:
+                self._inicio_paginas = ahora
+            else:
+                restante = (ahora - self._inicio_paginas) / hecho * (total - hecho)
+        evento = Evento(self.nombre, etapa, hecho, total, self.imagenes, restante, mensaje)
+        for oyente in self._oyentes:
+            oyente(evento)
+
+    def reenviar(self, evento):
+        """Pasa a los oyentes un Evento ya armado (p. ej. recibido de servicio.py)."""
+        self.imagenes = evento.imagenes
+        for oyente in self._oyentes:
+            oyente(evento)
+
+    def filas(self, n):
+        self.emitir("filas", n)
+        self.verificar()
+
+    def iniciar_paginas(self, total):
+        self.imagenes = 0
+        self.emitir("paginas", 0, total)
+
+    def pagina(self, hecho, total, imagenes=0):
+        """Una página más terminada, con `imagenes` fotos dibujadas en ella."""
+        self.imagenes += imagenes
+        self.emitir("paginas", hecho, total)
+        self.verificar()
+
+    def fin(self, salida):
+        self.emitir("fin", mensaje=salida)
+
+
+# -------------------------------
+# OYENTES
+# -------------------------------
+def describir(e):
+    """Texto corto de un evento, para mostrar en la interfaz o la consola."""
+    prefijo = f"[{e.nombre}] " if e.nombre else ""
+    if e.etapa == "filas":
+        return f"{prefijo}{e.hecho} filas leídas"
+    if e.etapa == "paginas":
+        texto = f"{prefijo}página {e.hecho}/{e.total}, {e.imagenes} fotos"
+        if e.restante is not None:
+            texto += f", faltan ~{e.restante:.0f} s"
+        return texto
+    if e.etapa == "fin":
+        return f"{prefijo}listo: {e.mensaje}"
+    return f"{prefijo}{e.etapa} {e.mensaje}".rstrip()
+
+
+def a_cola(cola):
+    """Oyente que deja cada evento en `cola` (queue.Queue), p. ej. para leerla desde Tk."""
+    return cola.put
+
+
+def a_log(logger):
+    """Oyente que registra cada evento en `logger` (nivel INFO)."""
+    return lambda e: logger.info(describir(e))
+
+
+def a_consola(salida=None, cada=10):
+    """Oyente que imprime las filas, cada `cada` % de páginas y el final."""
+    ultimo = {"pct": -1}
+
+    def oyente(e):
+        if e.etapa == "paginas":
+            pct = 100 * e.hecho // max(1, e.total)
+            if pct < ultimo["pct"] + cada and e.hecho != e.total:
+                return
+            ultimo["pct"] = pct
+        print(describir(e), file=salida or sys.stderr, flush=True)
+    return oyente
@@ -0,0 +1,88 @@
+# =====================================
+# revision_imagenes.py
+# =====================================
+"""
+Revisión previa de las fotos de producto, antes de dibujar nada.
+
+Cada ruta distinta se revisa una sola vez en un pool de hilos: existencia,
+formato y dimensiones leídos solo de la cabecera (Image.open no decodifica
+los píxeles). Las fotos que faltan o no se pueden leer se informan juntas y
+el producto queda sin imagen, así el dibujo nunca intenta abrirlas. Un
+archivo cortado tiene la cabecera bien y recién falla al decodificarse: ese
+caso lo cubre draw_product_card, que dibuja el aviso en su lugar.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+REVISION_HILOS = 8
+# Fotos con más píxeles que esto se informan: la caché las reduce, pero
+# decodificarlas cuesta tiempo y memoria (conviene achicarlas en origen)
+MAX_PIXELES = 12_000_000  # ~4000x3000
+
+Revision = namedtuple("Revision", ["estado", "formato", "ancho", "alto"])
+
+OK, FALTA, ILEGIBLE = "ok", "falta", "ilegible"
+
+
+def revisar_imagen(ruta):
+    """Devuelve la Revision de `ruta` leyendo solo la cabecera del archivo."""
+    if not os.path.isfile(ruta):
+        return Revision(FALTA, None, 0, 0)
+    try:
+        with Image.open(ruta) as img:
+            ancho, alto = img.size
+            formato = img.format
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return Revision(ILEGIBLE, None, 0, 0)
+    if not ancho or not alto:
+        return Revision(ILEGIBLE, formato, ancho, alto)
+    return Revision(OK, formato, ancho, alto)
+
+
+def revisar_imagenes(productos, hilos=REVISION_HILOS):
+    """Revisa en paralelo las fotos de `productos`; devuelve {ruta: Revision}."""
+    rutas = sorted({p.imagen for p in productos if p.imagen})
+    if not rutas:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(hilos, len(rutas)))) as pool:
+        return dict(zip(rutas, pool.map(revisar_imagen, rutas)))
+
+
+def reportar_revision(productos, revisiones):
+    """Imprime de una vez las fotos que faltan, las ilegibles y las muy grandes."""
+    problemas = {FALTA: [], ILEGIBLE: []}
+    grandes = []
+    for p in productos:
+        r = revisiones.get(p.imagen)
+        if r is None:
+            continue
+        if r.estado in problemas:
+            problemas[r.estado].append(p)
+        elif r.ancho * r.alto > MAX_PIXELES:
+            grandes.append((p, r))
+
+    for estado, titulo in ((FALTA, "no encontradas"), (ILEGIBLE, "ilegibles o dañadas")):
+        if problemas[estado]:
+            print(f"⚠️ {len(problemas[estado])} imágenes {titulo}:")
+            for p in problemas[estado]:
+                print(f"   {p.codigo}: {p.imagen}")
+    if grandes:
+        print(f"ℹ️ {len(grandes)} imágenes muy grandes (se reducen al dibujar):")
+        for p, r in grandes:
+            print(f"   {p.codigo}: {p.imagen} ({r.ancho}x{r.alto} {r.formato})")
+
+
+def validar_imagenes(productos, hilos=REVISION_HILOS):
+    """
+    Revisa las fotos, informa los problemas y devuelve los productos con
+    imagen vacía cuando la suya falta o no se puede leer.
+    """
+    revisiones = revisar_imagenes(productos, hilos)
+    reportar_revision(productos, revisiones)
+    return [p if not p.imagen or revisiones[p.imagen].estado == OK else p._replace(imagen="")
+            for p in productos]
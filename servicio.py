@@ -0,0 +1,405 @@
+# =====================================
+# servicio.py
+# =====================================
+"""
+Servicio local de generación: un proceso que queda abierto y genera los
+catálogos que le piden la interfaz o la línea de comandos.
+
+Cada generación desde cero paga el arranque de Python, la importación de
+reportlab, el registro de las fuentes, la decodificación del logo y la
+lectura de la hoja. El servicio hace todo eso una vez y lo mantiene en
+memoria: fuentes registradas, logo e íconos (cache_imagenes.lector_imagen),
+miniaturas de las fotos (CacheImagenes) y hojas ya leídas (CacheHojas).
+Todas esas cachés usan la fecha y el tamaño de cada archivo, así que un
+archivo modificado se vuelve a leer.
+
+    python servicio.py [--puerto 8765] [--concurrentes 2] [--carpeta-salida DIR ...]
+
+Escucha solo en 127.0.0.1. Los trabajos se encolan y se generan de a
+`concurrentes` a la vez (hilos). Los perfiles de salida que cambian el
+ASCII85 de ReportLab (global del proceso) no se dibujan a la vez:
+perfiles_salida.aplicar() hace esperar al trabajo que pide el otro valor.
+
+Cualquier página web que abra el usuario puede mandar pedidos a 127.0.0.1,
+así que el servicio solo atiende:
+    - pedidos con Host (y Origin, si viene) 127.0.0.1 o localhost, para
+      que no sirva un nombre de dominio que apunte a esta máquina;
+    - POST con Content-Type application/json: un navegador no lo manda a
+      otro sitio sin preguntar antes (CORS), y el servicio no lo permite;
+    - pedidos con la clave de esta instalación (encabezado X-Catalogos-Token).
+      La clave está en TOKEN_FILE, que crean el servicio o el cliente la
+      primera vez. Solo la puede leer este usuario.
+Además el PDF de salida tiene que terminar en .pdf y quedar dentro de las
+carpetas permitidas: la carpeta donde corre el servicio y las que se pasen
+con --carpeta-salida.
+
+API (JSON):
+    POST /trabajos                  entrada del manifiesto (ver cli.py) -> {"id", ...}
+    POST /trabajos?esperar=1        igual, pero responde cuando el PDF está listo
+    GET  /trabajos/<id>             estado, último evento de progreso y PDF
+    POST /trabajos/<id>/cancelar
+    GET  /estado                    trabajos y aciertos de las cachés
+
+Desde Python, generar_remoto(entrada, progreso) envía el trabajo, reenvía
+su progreso y devuelve la ruta del PDF. `python cli.py --servicio ...` y
+la interfaz Tk lo usan si el servicio está abierto.
+"""
+import argparse
+import hmac
+import itertools
+import json
+import os
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from progreso import Cancelado, Evento, Progreso
+
+# main, cli y el resto del generador se importan dentro del servicio: el
+# cliente (generar_remoto) no necesita cargar reportlab
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+HOST = "127.0.0.1"
+PUERTO = 8765
+URL = f"http://{HOST}:{PUERTO}"
+TRABAJOS_CONCURRENTES = 2
+TRABAJOS_GUARDADOS = 200     # trabajos terminados que se recuerdan para consultar su estado
+INTERVALO_CONSULTA = 0.1     # segundos entre consultas de generar_remoto (con progreso)
+TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".catalogos_ipt", "servicio.token")
+TOKEN_HEADER = "X-Catalogos-Token"
+HOSTS_PERMITIDOS = ("127.0.0.1", "localhost")
+
+EN_COLA, GENERANDO, LISTO, ERROR, CANCELADO = "en_cola", "generando", "listo", "error", "cancelado"
+TERMINADOS = (LISTO, ERROR, CANCELADO)
+
+
+# -------------------------------
+# CLAVE
+# -------------------------------
+def leer_token(ruta=TOKEN_FILE):
+    """Devuelve la clave de esta instalación; la crea (solo legible por el usuario) si no existe."""
+    try:
+        with open(ruta, encoding="ascii") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(ruta), mode=0o700, exist_ok=True)
+    try:
+        fd = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # la creó el otro lado (servicio o cliente) al mismo tiempo
+        return leer_token(ruta)
+    token = secrets.token_urlsafe(32)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(token)
+    return token
+
+
+# -------------------------------
+# TRABAJOS
+# -------------------------------
+class Trabajo:
+    def __init__(self, trabajo_id, entrada):
+        self.id = trabajo_id
+        self.entrada = entrada
+        self.estado = EN_COLA
+        self.salida = None
+        self.error = None
+        self.evento = None
+        self.segundos = None
+        self.terminado = threading.Event()
+        self.progreso = Progreso(entrada.get("titulo", ""), [self._guardar_evento])
+
+    def _guardar_evento(self, evento):
+        self.evento = evento
+
+    def resumen(self):
+        return {
+            "id": self.id,
+            "titulo": self.entrada.get("titulo"),
+            "estado": self.estado,
+            "salida": self.salida,
+            "error": self.error,
+            "segundos": self.segundos,
+            "evento": self.evento._asdict() if self.evento else None,
+        }
+
+
+class Servicio:
+    """Cola de trabajos de generación con las cachés de este proceso."""
+
+    def __init__(self, concurrentes=TRABAJOS_CONCURRENTES, carpetas_salida=None):
+        import main
+        from fuentes import cargar_fuentes
+        from productos import CacheHojas
+
+        cargar_fuentes()
+        if main.CACHE_HOJAS is None:
+            main.CACHE_HOJAS = CacheHojas()
+        self.hojas = main.CACHE_HOJAS
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrentes),
+                                        thread_name_prefix="trabajo")
+        self._trabajos = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.carpetas_salida = [os.path.realpath(c) for c in (carpetas_salida or [os.getcwd()])]
+
+    def _validar_salida(self, salida):
+        ruta = os.path.realpath(salida)
+        if not ruta.lower().endswith(".pdf"):
+            raise ValueError(f"La salida debe ser un .pdf: {salida}")
+        if not any(os.path.commonpath([ruta, c]) == c for c in self.carpetas_salida):
+            raise ValueError(f"La salida {salida} está fuera de las carpetas permitidas "
+                             f"({', '.join(self.carpetas_salida)}; ver --carpeta-salida)")
+
+    def enviar(self, entrada):
+        """Encola la generación de `entrada` (validada aquí) y devuelve su Trabajo."""
+        from cli import normalizar_entrada
+        self._validar_salida(normalizar_entrada(entrada)["salida"])  # ValueError antes de encolar
+        with self._lock:
+            trabajo = Trabajo(str(next(self._ids)), entrada)
+            self._trabajos[trabajo.id] = trabajo
+            terminados = [t for t in self._trabajos.values() if t.estado in TERMINADOS]
+            for viejo in terminados[:max(0, len(terminados) - TRABAJOS_GUARDADOS)]:
+                del self._trabajos[viejo.id]
+        self._pool.submit(self._generar, trabajo)
+        return trabajo
+
+    def _generar(self, trabajo):
+        import main
+        from cli import normalizar_entrada
+
+        t = time.perf_counter()
+        trabajo.estado = GENERANDO
+        try:
+            trabajo.progreso.verificar()
+            e = normalizar_entrada(trabajo.entrada)
+            # workers=1: se dibuja en este proceso, con las cachés ya cargadas
+            trabajo.salida = os.path.abspath(main.generar_catalogo(
+                e["titulo"], e["color"], output_file=e["salida"], workers=1, incremental=e["incremental"],
+                excel_file=e["entrada"], filtro=e["filtro"], maqueta=e["maqueta"],
+                progreso=trabajo.progreso, perfil=e["perfil"]))
+            trabajo.estado = LISTO
+        except Cancelado:
+            trabajo.estado = CANCELADO
+        except Exception as ex:
+            trabajo.error = f"{type(ex).__name__}: {ex}"
+            trabajo.estado = ERROR
+        finally:
+            trabajo.segundos = round(time.perf_counter() - t, 3)
+            trabajo.terminado.set()
+
+    def obtener(self, trabajo_id):
+        with self._lock:
+            return self._trabajos.get(trabajo_id)
+
+    def cancelar(self, trabajo_id):
+        trabajo = self.obtener(trabajo_id)
+        if trabajo is not None:
+            trabajo.progreso.cancelar()
+        return trabajo
+
+    def estado(self):
+        from cache_imagenes import cache_por_defecto
+        with self._lock:
+            trabajos = [t.resumen() for t in self._trabajos.values()]
+        return {
+            "pid": os.getpid(),
+            "trabajos": trabajos,
+            "hojas": {"aciertos": self.hojas.aciertos, "fallos": self.hojas.fallos},
+            "imagenes": {"aciertos": cache_por_defecto.aciertos, "fallos": cache_por_defecto.fallos},
+        }
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# -------------------------------
+# HTTP
+# -------------------------------
+class _Manejador(BaseHTTPRequestHandler):
+    servicio = None   # lo fijan servir()
+    token = None
+
+    def _responder(self, codigo, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _partes(self):
+        url = urlparse(self.path)
+        return [p for p in url.path.split("/") if p], parse_qs(url.query)
+
+    def _rechazo(self, json_requerido=False):
+        """(código, mensaje) si el pedido no viene de un cliente local con la clave; si no, None."""
+        host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+        origen = self.headers.get("Origin")
+        if host not in HOSTS_PERMITIDOS or (origen and urlparse(origen).hostname not in HOSTS_PERMITIDOS):
+            return 403, "solo se aceptan pedidos locales"
+        if json_requerido and self.headers.get_content_type() != "application/json":
+            return 415, "el cuerpo debe ser application/json"
+        if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.token):
+            return 403, f"falta la clave del servicio ({TOKEN_HEADER})"
+        return None
+
+    def do_GET(self):
+        rechazo = self._rechazo()
+        if rechazo:
+            return self._responder(rechazo[0], {"error": rechazo[1]})
+        partes, _ = self._partes()
+        if partes == ["estado"]:
+            return self._responder(200, self.servicio.estado())
+        if len(partes) == 2 and partes[0] == "trabajos":
+            trabajo = self.servicio.obtener(partes[1])
+            if trabajo is None:
+                return self._responder(404, {"error": f"trabajo desconocido: {partes[1]}"})
+            return self._responder(200, trabajo.resumen())
+        self._responder(404, {"error": "ruta desconocida"})
+
+    def do_POST(self):
+        rechazo = self._rechazo(json_requerido=True)
+        if rechazo:
+            return self._responder(rechazo[0], {"error": rechazo[1]})
+        partes, consulta = self._partes()
+        if partes == ["trabajos"]:
+            try:
+                largo = int(self.headers.get("Content-Length") or 0)
+                entrada = json.loads(self.rfile.read(largo) or b"{}")
+                if not isinstance(entrada, dict):
+                    raise ValueError("el cuerpo debe ser un objeto JSON")
+                trabajo = self.servicio.enviar(entrada)
+            except ValueError as e:
+                return self._responder(400, {"error": str(e)})
+            if consulta.get("esperar", ["0"])[0] not in ("", "0"):
+                trabajo.terminado.wait()
+            return self._responder(202 if trabajo.estado not in TERMINADOS else 200, trabajo.resumen())
+        if len(partes) == 3 and partes[0] == "trabajos" and partes[2] == "cancelar":
+            trabajo = self.servicio.cancelar(partes[1])
+            if trabajo is None:
+                return self._responder(404, {"error": f"trabajo desconocido: {partes[1]}"})
+            return self._responder(200, trabajo.resumen())
+        self._responder(404, {"error": "ruta desconocida"})
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def servir(host=HOST, puerto=PUERTO, concurrentes=TRABAJOS_CONCURRENTES, carpetas_salida=None):
+    """Abre el servicio y atiende pedidos hasta Ctrl+C."""
+    servicio = Servicio(concurrentes, carpetas_salida)
+    manejador = type("Manejador", (_Manejador,), {"servicio": servicio, "token": leer_token()})
+    with ThreadingHTTPServer((host, puerto), manejador) as servidor:
+        servidor.daemon_threads = True
+        print(f"🟢 Servicio de catálogos en http://{host}:{puerto} ({concurrentes} trabajos a la vez)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servicio.cerrar()
+
+
+# -------------------------------
+# CLIENTE
+# -------------------------------
+def _pedir(url, metodo="GET", datos=None, timeout=10):
+    cuerpo = json.dumps(datos).encode("utf-8") if datos is not None else None
+    pedido = urllib.request.Request(url, data=cuerpo, method=metodo,
+                                    headers={"Content-Type": "application/json",
+                                             TOKEN_HEADER: leer_token()})
+    try:
+        with urllib.request.urlopen(pedido, timeout=timeout) as r:
+            return json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        try:
+            mensaje = json.loads(e.read()).get("error", str(e))
+        except ValueError:
+            mensaje = str(e)
+        raise (ValueError if e.code == 400 else RuntimeError)(mensaje)
+
+
+def disponible(url=URL, timeout=0.5):
+    """True si el que escucha en `url` es este servicio (otro programa en el puerto no cuenta)."""
+    try:
+        estado = _pedir(f"{url}/estado", timeout=timeout)
+    except (OSError, ValueError, RuntimeError):
+        return False
+    return isinstance(estado, dict) and "trabajos" in estado
+
+
+def _rutas_absolutas(entrada):
+    # El servicio puede correr en otra carpeta: las rutas dadas se resuelven
+    # aquí; las que faltan toman el valor por defecto en la carpeta del servicio
+    entrada = dict(entrada)
+    for clave in ("entrada", "salida"):
+        if entrada.get(clave):
+            entrada[clave] = os.path.abspath(entrada[clave])
+    return entrada
+
+
+def enviar(entrada, url=URL, esperar=False):
+    """
+    Encola `entrada` en el servicio y devuelve el resumen del trabajo (con
+    esperar=True, cuando ya terminó).
+    """
+    consulta = "?esperar=1" if esperar else ""
+    return _pedir(f"{url}/trabajos{consulta}", "POST", _rutas_absolutas(entrada),
+                  timeout=None if esperar else 10)
+
+
+def _resultado(trabajo):
+    if trabajo["estado"] == LISTO:
+        return trabajo["salida"]
+    if trabajo["estado"] == CANCELADO:
+        raise Cancelado(trabajo["titulo"] or "generación cancelada")
+    if trabajo["estado"] == ERROR:
+        raise RuntimeError(trabajo["error"])
+    return None
+
+
+def generar_remoto(entrada, progreso=None, url=URL, intervalo=INTERVALO_CONSULTA):
+    """
+    Genera `entrada` en el servicio y devuelve la ruta del PDF. Con
+    `progreso` los eventos se reenvían a sus oyentes y, si se cancela, se
+    cancela el trabajo y se lanza progreso.Cancelado; sin él se hace un
+    solo pedido que responde al terminar. Un error del trabajo se lanza
+    como RuntimeError; sin servicio, urllib lanza OSError.
+    """
+    if progreso is None:
+        return _resultado(enviar(entrada, url, esperar=True))
+
+    trabajo = enviar(entrada, url)
+    ultimo = None
+    while True:
+        if progreso.cancelado:
+            _pedir(f"{url}/trabajos/{trabajo['id']}/cancelar", "POST", {})
+        trabajo = _pedir(f"{url}/trabajos/{trabajo['id']}")
+        if trabajo["evento"] and trabajo["evento"] != ultimo:
+            ultimo = trabajo["evento"]
+            progreso.reenviar(Evento(**ultimo))
+        salida = _resultado(trabajo)
+        if salida is not None:
+            return salida
+        time.sleep(intervalo)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local de generación de catálogos.")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--concurrentes", type=int, default=TRABAJOS_CONCURRENTES,
+                        help="trabajos generados a la vez")
+    parser.add_argument("--carpeta-salida", action="append", metavar="DIR",
+                        help="carpeta donde el servicio puede escribir PDFs (repetible; "
+                             "por defecto la carpeta actual)")
+    args = parser.parse_args()
+    servir(HOST, args.puerto, args.concurrentes, args.carpeta_salida)
@@ -0,0 +1,94 @@
+# =====================================
+# texto.py
+# =====================================
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+CACHE_DESCRIPCIONES = 8192  # textos ya divididos que se recuerdan (LRU)
+
+# Resultado de dividir un texto: líneas a dibujar y si quedaron palabras fuera
+Envoltura = namedtuple("Envoltura", ["lineas", "truncado"])
+
+# Anchos en unidades de 1/1000 de punto por tamaño 1 (como las métricas de
+# la fuente), así una tabla por fuente sirve para cualquier tamaño.
+_anchos_glifo = {}
+_anchos_palabra = {}
+_lock = threading.Lock()
+
+
+# -------------------------------
+# MEDIDAS
+# -------------------------------
+def _tabla(fuente):
+    tabla = _anchos_palabra.get(fuente)
+    if tabla is None:
+        with _lock:
+            tabla = _anchos_palabra.setdefault(fuente, {})
+            _anchos_glifo.setdefault(fuente, {})
+    return tabla
+
+
+def ancho_palabra(palabra, fuente):
+    """Ancho de `palabra` en milésimas de punto a tamaño 1."""
+    tabla = _tabla(fuente)
+    ancho = tabla.get(palabra)
+    if ancho is None:
+        glifos = _anchos_glifo[fuente]
+        ancho = 0
+        for ch in palabra:
+            w = glifos.get(ch)
+            if w is None:
+                w = glifos[ch] = stringWidth(ch, fuente, 1000)
+            ancho += w
+        tabla[palabra] = ancho
+    return ancho
+
+
+def ancho_texto(texto, fuente, tamaño_fuente):
+    """Equivalente a stringWidth(texto, fuente, tamaño) usando las tablas."""
+    return 0.001 * tamaño_fuente * ancho_palabra(texto, fuente)
+
+
+# -------------------------------
+# DIVISIÓN EN LÍNEAS
+# -------------------------------
+@lru_cache(maxsize=CACHE_DESCRIPCIONES)
+def dividir(texto, ancho_max, fuente, tamaño_fuente, max_lineas=2):
+    """
+    Divide `texto` en como máximo `max_lineas` líneas de ancho <= ancho_max.
+    Cada palabra se mide una sola vez; las líneas se van armando sumando
+    anchos. Devuelve una Envoltura; truncado=True si sobraron palabras.
+    """
+    palabras = str(texto).split()
+    espacio = ancho_palabra(" ", fuente)
+    escala = 0.001 * tamaño_fuente
+
+    lineas, actual, ancho_actual = [], [], 0
+    for palabra in palabras:
+        w = ancho_palabra(palabra, fuente)
+        prueba = ancho_actual + espacio + w if actual else w
+        if escala * prueba <= ancho_max:
+            actual.append(palabra)
+            ancho_actual = prueba
+        else:
+            if actual:
+                lineas.append(" ".join(actual))
+            actual, ancho_actual = [palabra], w
+            if len(lineas) >= max_lineas:
+                break
+    if actual and len(lineas) < max_lineas:
+        lineas.append(" ".join(actual))
+
+    lineas = tuple(lineas[:max_lineas])
+    usadas = sum(len(linea.split()) for linea in lineas)
+    return Envoltura(lineas, usadas < len(palabras))
+
+
+def dividir_lote(textos, ancho_max, fuente, tamaño_fuente, max_lineas=2):
+    """Divide todos los textos de una vez (antes de empezar a dibujar)."""
+    return [dividir(str(t), ancho_max, fuente, tamaño_fuente, max_lineas) for t in textos]